@@ -7,6 +7,7 @@ from uuid import uuid4
 
 from backend.llm.adapter import get_llm_adapter
 from backend.settings import get_settings
+from backend.utils.backoff import aretry
 from backend.utils.logging import get_logger
 
 LOGGER = get_logger(__name__)
@@ -39,6 +40,11 @@ class CEOAgent:
             return self._mock_plan(description, target, persona_prompt=persona_prompt, agent_preset=agent_preset, research_results=research_results)
         return await self._llm_plan(description, target, persona_prompt=persona_prompt, agent_preset=agent_preset, research_results=research_results)
 
+    @aretry()
+    async def _complete(self, prompt: str) -> str:
+        async with self._semaphore:
+            return await self.adapter.acomplete(prompt, json_mode=True)
+
     def _extract_tech_hints_from_team(self, persona_prompt: str) -> Dict[str, Any]:
         """Parse team composition and return tech preferences."""
         hints = {"languages": [], "formats": [], "has_cpp": False, "has_python": False, "has_latex": False, "has_technical_writer": False}
@@ -242,41 +248,9 @@ class CEOAgent:
             "5. Return ONLY JSON, no text before or after\n"
         )
 
-        # Rate limit handling
-        rate_limit_backoffs = [10, 20, 40]
-        rate_limit_attempt = 0
-        
-        def _is_rate_limit_error(exc: Exception) -> bool:
-            try:
-                from tenacity import RetryError
-                if isinstance(exc, RetryError):
-                    last = exc.last_attempt.exception()
-                    if last and last.__class__.__name__ == "RateLimitError":
-                        return True
-            except Exception:
-                pass
-            name = exc.__class__.__name__
-            if name == "RateLimitError":
-                return True
-            txt = (str(exc) or "").lower()
-            return ("rate limit" in txt) or ("ratelimit" in txt) or ("RateLimitError" in repr(exc))
-        
         try:
             LOGGER.info("CEO calling LLM adapter (mode=%s)...", settings.llm_mode)
-            
-            while True:
-                try:
-                    async with self._semaphore:
-                        response = await self.adapter.acomplete(prompt, json_mode=True)
-                    break  # Success
-                except Exception as exc:
-                    if _is_rate_limit_error(exc) and rate_limit_attempt < len(rate_limit_backoffs):
-                        wait_s = rate_limit_backoffs[rate_limit_attempt]
-                        rate_limit_attempt += 1
-                        LOGGER.warning("CEO rate limit hit, waiting %ds...", wait_s)
-                        await asyncio.sleep(wait_s)
-                        continue
-                    raise
+            response = await self._complete(prompt)
             
             LOGGER.info("CEO received plan response (length=%d chars)", len(response or ""))
             
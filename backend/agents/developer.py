@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from backend.core.event_bus import emit_event
+from backend.core.state import AgentContext
 from backend.llm.adapter import get_llm_adapter
 from backend.memory import utils as db_utils
 from backend.memory.db import get_session
@@ -15,6 +16,7 @@ from backend.memory.vector_store import get_project_memory
 from backend.memory.knowledge_sources import get_knowledge_registry
 from backend.settings import get_settings
 from backend.utils.fileutils import write_files_async
+from backend.utils.backoff import backoff_delay, is_rate_limit_error, rate_limit_cooldown
 from backend.utils.json_parser import clean_and_parse_json
 from backend.utils.logging import get_logger
 from backend.utils.path_normalizer import normalize_artifact_path
@@ -41,11 +43,11 @@ class DeveloperAgent:
     async def run(
         self,
         step: Dict[str, Any],
-        context: Dict[str, Any],
+        context: AgentContext,
         stop_event,
         on_message: Optional[Any] = None,
     ) -> None:
-        project_id = context["project_id"]
+        project_id = context.project_id
         if stop_event.is_set():
             LOGGER.info("Project %s stop requested; skipping step.", project_id)
             return
@@ -116,7 +118,7 @@ class DeveloperAgent:
             try:
                 from backend.agents.reviewer import ReviewerAgent
                 reviewer = ReviewerAgent(self._semaphore)
-                task_desc = f"{context['title']}: {step_name}"
+                task_desc = f"{context.title}: {step_name}"
                 review_result = await reviewer.review(task_desc, critical_files)
                 
                 if not review_result["approved"]:
@@ -142,14 +144,14 @@ class DeveloperAgent:
 
     async def auto_correct(
         self,
-        context: Dict[str, Any],
+        context: AgentContext,
         issues: List[str],
         stop_event: asyncio.Event,
     ) -> None:
         if stop_event.is_set():
             return
 
-        project_id = context["project_id"]
+        project_id = context.project_id
         await self._broadcast_thought(project_id, "Attempting to auto-correct issues...", "info")
         
         # Filter out non-critical issues (missing dependencies, style issues, etc.)
@@ -189,9 +191,9 @@ class DeveloperAgent:
         
         prompt = (
             "You are a senior developer fixing CRITICAL bugs in a project.\n"
-            f"Project: {context['title']}\n"
-            f"Description: {context['description']}\n"
-            f"Tech Stack: {context.get('tech_stack', 'unknown')}\n"
+            f"Project: {context.title}\n"
+            f"Description: {context.description}\n"
+            f"Tech Stack: {context.tech_stack or 'unknown'}\n"
             "\n"
             "EXISTING CODE:\n"
             f"{project_context}\n"
@@ -232,14 +234,14 @@ class DeveloperAgent:
     async def _generate_single_file(
         self,
         spec: Dict[str, Any],
-        context: Dict[str, Any],
+        context: AgentContext,
         step: Dict[str, Any],
         stop_event,
     ) -> Dict[str, str]:
         if stop_event.is_set():
             raise asyncio.CancelledError()
 
-        project_id = context["project_id"]
+        project_id = context.project_id
         path_value = normalize_artifact_path(spec.get("path", "unknown_artifact.txt"))
 
         # --- TURBO TEMPLATES START ---
@@ -444,28 +446,13 @@ class DeveloperAgent:
                 )
             )
 
-    async def _execute_with_retry(self, prompt: str, step: Dict[str, Any], context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def _execute_with_retry(self, prompt: str, step: Dict[str, Any], context: AgentContext) -> Optional[Dict[str, Any]]:
         max_retries = 2
         current_prompt = prompt
-        project_id = context["project_id"]
-        rate_limit_backoffs = [10, 20, 40]  # seconds (in addition to adapter-level retries)
+        project_id = context.project_id
+        step_name = step.get("name", "unknown")
+        rate_limit_max_retries = 3  # in addition to adapter-level retries
         rate_limit_attempt = 0
-
-        def _is_rate_limit_error(exc: Exception) -> bool:
-            # Avoid hard dependency on provider SDKs in agent layer.
-            try:
-                from tenacity import RetryError  # type: ignore[import-not-found]
-                if isinstance(exc, RetryError):
-                    last = exc.last_attempt.exception()
-                    if last and last.__class__.__name__ == "RateLimitError":
-                        return True
-            except Exception:
-                pass
-            name = exc.__class__.__name__
-            if name == "RateLimitError":
-                return True
-            txt = (str(exc) or "").lower()
-            return ("rate limit" in txt) or ("ratelimit" in txt) or ("RateLimitError" in repr(exc))
         
         # Добавляем контекст из долгосрочной памяти (с обработкой ошибок и ограничениями)
         if getattr(self._settings, "enable_memory_search", True):
@@ -475,7 +462,7 @@ class DeveloperAgent:
                 max_chars = getattr(self._settings, "memory_search_max_chars", 1000)
                 
                 results = memory.search(
-                    f"{context.get('title', '')} {step.get('name', '')}",
+                    f"{context.title} {step_name}",
                     n_results=max_results
                 )
                 
@@ -502,7 +489,6 @@ class DeveloperAgent:
         # 3. LLM Call with Retry Loop
         attempt = 0
         while attempt <= max_retries:
-            step_name = step.get("name", "unknown")
             LOGGER.info(
                 "Calling LLM adapter (mode=%s) for step '%s' (attempt %d/%d)",
                 self._settings.llm_mode,
@@ -515,6 +501,7 @@ class DeveloperAgent:
                 await self._broadcast_thought(project_id, f"Retrying LLM generation (attempt {attempt + 1}/{max_retries + 1})...", "warning")
 
             try:
+                await rate_limit_cooldown.wait()
                 LOGGER.debug("Acquiring semaphore for LLM call...")
                 async with self._semaphore:
                     LOGGER.debug("Semaphore acquired, calling LLM adapter...")
@@ -526,16 +513,17 @@ class DeveloperAgent:
                 LOGGER.warning("LLM call failed: %s: %s", exc_name, exc_msg[:200])
                 
                 # If the provider exhausted its internal retries (tenacity RetryError), do a cooldown here.
-                if _is_rate_limit_error(exc) and rate_limit_attempt < len(rate_limit_backoffs):
-                    wait_s = rate_limit_backoffs[rate_limit_attempt]
+                if is_rate_limit_error(exc) and rate_limit_attempt < rate_limit_max_retries:
+                    wait_s = backoff_delay(rate_limit_attempt)
                     rate_limit_attempt += 1
-                    LOGGER.info("Rate limit detected, waiting %ds before retry...", wait_s)
+                    LOGGER.info("Rate limit detected, waiting %.0fs before retry...", wait_s)
                     await self._broadcast_thought(
                         project_id,
-                        f"Rate limit hit. Cooling down for {wait_s}s and retrying…",
+                        f"Rate limit hit. Cooling down for {wait_s:.0f}s and retrying…",
                         "warning",
                     )
-                    await asyncio.sleep(wait_s)
+                    # Shared cooldown: concurrent steps hold off too; waited at the top of the loop
+                    rate_limit_cooldown.trip(wait_s)
                     # Retry same attempt (do not consume a JSON-repair retry)
                     continue
                 
@@ -580,7 +568,7 @@ class DeveloperAgent:
                     try:
                         memory = get_project_memory(project_id)
                         memory.add_decision(
-                            decision=f"Step '{step.get('name')}' completed",
+                            decision=f"Step '{step_name}' completed",
                             reasoning=parsed.get("_thought", "")
                         )
                     except Exception as e:
@@ -666,7 +654,7 @@ class DeveloperAgent:
 
     def _build_prompt(
         self, 
-        context: Dict[str, Any], 
+        context: AgentContext, 
         step: Dict[str, Any], 
         files_spec: List[Dict[str, Any]],
         feedback: List[str] = [],
@@ -749,3 +737,18 @@ class DeveloperAgent:
             normalized.append({"path": safe_path, "content": content_str})
 
         return normalized
+
+
+_developer: Optional[DeveloperAgent] = None
+
+def get_developer(llm_semaphore) -> DeveloperAgent:
+    """Return the process-wide DeveloperAgent bound to ``llm_semaphore``.
+
+    Rebuilt when a different semaphore is passed or settings were reloaded
+    (``get_settings.cache_clear()``), since the agent keeps a settings reference.
+    """
+    global _developer
+    developer = _developer
+    if developer is None or developer._semaphore is not llm_semaphore or developer._settings is not get_settings():
+        developer = _developer = DeveloperAgent(llm_semaphore)
+    return developer
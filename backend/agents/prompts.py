@@ -2,6 +2,7 @@ from typing import List, Dict, Any, Optional
 import json
 
 from backend.core.presets import get_preset_by_id
+from backend.core.state import AgentContext
 
 class PromptBuilder:
 
@@ -76,18 +77,18 @@ class PromptBuilder:
         return "code"
 
     @staticmethod
-    def build_project_context(context: Dict[str, Any], tech_stack: str) -> str:
+    def build_project_context(context: AgentContext, tech_stack: str) -> str:
         return (
             f"=== PROJECT ===\n"
-            f"Title: {context.get('title')}\n"
-            f"Description: {context.get('description')}\n"
-            f"Target: {context.get('target')}\n"
+            f"Title: {context.title}\n"
+            f"Description: {context.description}\n"
+            f"Target: {context.target}\n"
             f"Tech Stack: {tech_stack}\n"
         )
 
     @staticmethod
-    def build_research_context(context: Dict[str, Any]) -> str:
-        payload = context.get("research_results")
+    def build_research_context(context: AgentContext) -> str:
+        payload = context.research_results
         if not isinstance(payload, dict):
             return ""
         try:
@@ -171,7 +172,7 @@ class PromptBuilder:
 
     @staticmethod
     def assemble_prompt(
-        context: Dict[str, Any],
+        context: AgentContext,
         step: Dict[str, Any],
         files_spec: List[Dict[str, Any]],
         feedback: List[str] = [],
@@ -179,9 +180,9 @@ class PromptBuilder:
         knowledge_context: str = ""
     ) -> str:
         payload = step.get("payload", {})
-        tech_stack = payload.get("tech_stack", "").strip() or context.get("tech_stack", "")
-        persona = payload.get("agent_preset") or context.get("agent_preset") or ""
-        persona_override = payload.get("persona_prompt") or context.get("persona_prompt") or ""
+        tech_stack = payload.get("tech_stack", "").strip() or (context.tech_stack or "")
+        persona = payload.get("agent_preset") or context.agent_preset or ""
+        persona_override = payload.get("persona_prompt") or context.persona_prompt or ""
         mode = PromptBuilder._infer_mode_from_files(files_spec)
 
         parts = [
@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from backend.core.event_bus import emit_event
+from backend.core.event_bus import emit_event, emit_event_nowait
 from backend.llm.adapter import get_llm_adapter
 from backend.memory import utils as db_utils
 from backend.memory.db import get_session
@@ -16,6 +16,7 @@ from backend.memory.vector_store import get_project_memory
 from backend.settings import get_settings
 from backend.utils.fileutils import write_files, iter_file_entries, read_project_file, get_file_size_cached
 from itertools import islice
+from backend.utils.backoff import backoff_delay, is_rate_limit_error, rate_limit_cooldown
 from backend.utils.json_parser import clean_and_parse_json
 from backend.utils.logging import get_logger
 
@@ -35,11 +36,8 @@ class RefactorAgent:
         return self._adapter
 
     async def _broadcast_thought(self, project_id: str, msg: str, level: str = "info"):
-        # Don't await - fire and forget to avoid blocking
-        import asyncio
-        asyncio.create_task(
-            emit_event(project_id, msg, agent="refactor", level=level, persist=False)
-        )
+        # Fire and forget to avoid blocking
+        emit_event_nowait(project_id, msg, agent="refactor", level=level, persist=False)
 
     async def chat(self, project_id: UUID, message: str, history: Optional[List[Dict[str, str]]] = None) -> str:
         project_path = self._settings.projects_root / str(project_id)
@@ -90,27 +88,13 @@ class RefactorAgent:
         max_retries = 2
         updates = None
         last_error = None
-        rate_limit_backoffs = [10, 20, 40]
+        rate_limit_max_retries = 3
         rate_limit_attempt = 0
-
-        def _is_rate_limit_error(exc: Exception) -> bool:
-            try:
-                from tenacity import RetryError  # type: ignore[import-not-found]
-                if isinstance(exc, RetryError):
-                    last = exc.last_attempt.exception()
-                    if last and last.__class__.__name__ == "RateLimitError":
-                        return True
-            except Exception:
-                pass
-            name = exc.__class__.__name__
-            if name == "RateLimitError":
-                return True
-            txt = (str(exc) or "").lower()
-            return ("rate limit" in txt) or ("ratelimit" in txt) or ("RateLimitError" in repr(exc))
         
         for attempt in range(max_retries):
             try:
                 # Use native JSON mode if available
+                await rate_limit_cooldown.wait()
                 async with self._semaphore:
                     response = await self.adapter.acomplete(prompt, json_mode=True)
                 
@@ -129,12 +113,11 @@ class RefactorAgent:
                 LOGGER.warning("RefactorAgent attempt %d failed: %s", attempt + 1, exc)
 
                 # Provider rate-limit: cooldown and retry without rewriting the prompt
-                if _is_rate_limit_error(exc) and rate_limit_attempt < len(rate_limit_backoffs):
-                    wait_s = rate_limit_backoffs[rate_limit_attempt]
+                if is_rate_limit_error(exc) and rate_limit_attempt < rate_limit_max_retries:
+                    wait_s = backoff_delay(rate_limit_attempt)
                     rate_limit_attempt += 1
-                    await self._broadcast_thought(str(project_id), f"Rate limit hit. Cooling down for {wait_s}s…", "warning")
-                    import asyncio
-                    await asyncio.sleep(wait_s)
+                    await self._broadcast_thought(str(project_id), f"Rate limit hit. Cooling down for {wait_s:.0f}s…", "warning")
+                    rate_limit_cooldown.trip(wait_s)
                     continue
                 
                 if attempt < max_retries - 1:
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import re
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 
@@ -15,6 +16,22 @@ from backend.utils.logging import get_logger
 
 LOGGER = get_logger(__name__)
 
+_RESULT_TTL_S = 60.0
+_RESULT_CACHE_MAX = 128
+
+_SearchKey = Tuple[str, str, int]  # (provider, query, max_results)
+_inflight: Dict[_SearchKey, "asyncio.Task[Dict[str, Any]]"] = {}
+_recent_results: Dict[_SearchKey, Tuple[float, Dict[str, Any]]] = {}
+
+def _on_search_done(key: _SearchKey, task: "asyncio.Task[Dict[str, Any]]") -> None:
+    _inflight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    _recent_results[key] = (time.monotonic(), task.result())
+    if len(_recent_results) > _RESULT_CACHE_MAX:
+        # dicts keep insertion order: drop the oldest entry
+        _recent_results.pop(next(iter(_recent_results)))
+
 @dataclass
 class SearchResult:
     title: str
@@ -25,6 +42,10 @@ class SearchResult:
     def to_dict(self) -> Dict[str, Any]:
         return {"title": self.title, "url": self.url, "snippet": self.snippet, "source": self.source}
 
+def _copy_payload(payload: Dict[str, Any], *, cached: bool) -> Dict[str, Any]:
+    # Shared payloads stay private to the cache: each caller gets its own result dicts
+    return {**payload, "results": [dict(r) for r in payload.get("results", [])], "cached": cached}
+
 class ResearcherAgent:
 
     def __init__(self) -> None:
@@ -37,8 +58,37 @@ class ResearcherAgent:
 
         provider = self._settings.search_provider
         max_results = max(1, min(int(max_results), int(self._settings.max_search_results)))
+        key = (provider, query, max_results)
+
+        # Singleflight: pre-plan research and research_node ask for the same query
+        # back to back, so share one provider call and briefly keep its result.
+        hit = _recent_results.get(key)
+        if hit is not None and time.monotonic() - hit[0] < _RESULT_TTL_S:
+            payload = _copy_payload(hit[1], cached=True)
+        elif key in _inflight:
+            # shield: a caller timing out must not cancel the shared search
+            payload = _copy_payload(await asyncio.shield(_inflight[key]), cached=True)
+        else:
+            task = asyncio.create_task(self._run_provider(query, provider, max_results))
+            _inflight[key] = task
+            task.add_done_callback(functools.partial(_on_search_done, key))
+            payload = _copy_payload(await asyncio.shield(task), cached=False)
+
+        # Store in project memory (so LLM can retrieve later even if state isn't threaded)
+        if project_id:
+            try:
+                pm = get_project_memory(project_id)
+                pm.add_context(
+                    content=f"WEB RESEARCH\nQuery: {query}\nProvider: {payload['provider']}\n\n{self._format_for_memory(payload)}",
+                    context_type="research",
+                    metadata={"query": query, "provider": payload["provider"]},
+                )
+            except Exception:
+                LOGGER.debug("Failed to store research in project memory.", exc_info=True)
 
-        # Run provider
+        return payload
+
+    async def _run_provider(self, query: str, provider: str, max_results: int) -> Dict[str, Any]:
         payload: Dict[str, Any]
         try:
             if provider == "google":
@@ -58,19 +108,6 @@ class ResearcherAgent:
         payload.setdefault("provider", provider)
         payload["cached"] = False
         payload["timestamp_ms"] = int(time.time() * 1000)
-
-        # Store in project memory (so LLM can retrieve later even if state isn't threaded)
-        if project_id:
-            try:
-                pm = get_project_memory(project_id)
-                pm.add_context(
-                    content=f"WEB RESEARCH\nQuery: {query}\nProvider: {provider}\n\n{self._format_for_memory(payload)}",
-                    context_type="research",
-                    metadata={"query": query, "provider": provider},
-                )
-            except Exception:
-                LOGGER.debug("Failed to store research in project memory.", exc_info=True)
-
         return payload
 
     async def search_for_tech(self, tech_name: str, project_id: Optional[str] = None) -> Dict[str, Any]:
@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from backend.core.event_bus import emit_event
+from backend.core.state import AgentContext
 from backend.llm.adapter import get_llm_adapter
 from backend.settings import get_settings
 from backend.sandbox.executor import execute_safe
@@ -33,7 +34,7 @@ class TesterAgent:
     async def _broadcast_thought(self, project_id: str, msg: str, level: str = "info"):
         await emit_event(project_id, msg, agent="tester", level=level, persist=False)
 
-    async def test_project(self, project_id: UUID, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def test_project(self, project_id: UUID, context: AgentContext) -> Dict[str, Any]:
         project_id_str = str(project_id)
         await self._broadcast_thought(project_id_str, "Starting comprehensive testing...")
         
@@ -188,9 +189,9 @@ class TesterAgent:
             "issues": issues
         }
 
-    async def _check_runtime(self, project_path: Path, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _check_runtime(self, project_path: Path, context: AgentContext) -> Dict[str, Any]:
         issues = []
-        target = context.get("target", "web")
+        target = context.target or "web"
         # Try to infer stack if not explicit (fallback)
         try:
             is_cpp = any(
@@ -289,7 +290,7 @@ class TesterAgent:
             "issues": issues
         }
 
-    async def _check_logic(self, project_path: Path, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _check_logic(self, project_path: Path, context: AgentContext) -> Dict[str, Any]:
         try:
             # Read all files
             files_content = []
@@ -324,9 +325,9 @@ class TesterAgent:
                 "IGNORE: Style issues, missing documentation, optimization suggestions, or minor warnings.\n"
                 "\n"
                 f"=== PROJECT ===\n"
-                f"Title: {context.get('title')}\n"
-                f"Description: {context.get('description')}\n"
-                f"Target: {context.get('target')}\n"
+                f"Title: {context.title}\n"
+                f"Description: {context.description}\n"
+                f"Target: {context.target}\n"
                 "\n"
                 f"=== CODE ===\n"
                 + "\n\n".join(files_content)
@@ -9,6 +9,7 @@ from pydantic import BaseModel, Field as PydanticField
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.persona import invalidate_persona_cache
 from backend.memory.db import get_session_dependency
 from backend.memory.models import CustomAgent
 
@@ -107,6 +108,7 @@ async def update_custom_agent(
 
     session.add(agent)
     await session.commit()
+    invalidate_persona_cache()
     await session.refresh(agent)
     return CustomAgentOut.model_validate(agent, from_attributes=True)
 
@@ -122,4 +124,5 @@ async def delete_custom_agent(
 
     await session.delete(agent)
     await session.commit()
+    invalidate_persona_cache()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
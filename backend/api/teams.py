@@ -9,6 +9,7 @@ from pydantic import BaseModel, Field as PydanticField
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.persona import invalidate_persona_cache
 from backend.core.presets import get_preset_by_id
 from backend.memory.db import get_session_dependency
 from backend.memory.models import CustomAgent, Team, TeamAgentLink, TeamMember
@@ -203,6 +204,7 @@ async def update_team(
 
     session.add(team)
     await session.commit()
+    invalidate_persona_cache()
     await session.refresh(team)
 
     agent_ids, preset_ids = await _get_team_members(session, team.id)
@@ -240,4 +242,5 @@ async def delete_team(
 
     await session.delete(team)
     await session.commit()
+    invalidate_persona_cache()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import inspect
 import aiosqlite
 from pathlib import Path
-from typing import AsyncIterator
+from typing import Any, AsyncIterator, Dict
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.pregel import Pregel
 
 from backend.utils.logging import get_logger
 
@@ -19,6 +21,13 @@ if not hasattr(aiosqlite.Connection, 'is_alive'):
     
     aiosqlite.Connection.is_alive = is_alive
 
+# Where LangGraph supports it, checkpoints are written in the background so the
+# next node starts without waiting on the previous node's checkpoint commit. A
+# crash can lose at most the latest checkpoint; resume then re-runs that node.
+ASYNC_CHECKPOINT_KWARGS: Dict[str, Any] = (
+    {"durability": "async"} if "durability" in inspect.signature(Pregel.ainvoke).parameters else {}
+)
+
 _saver: AsyncSqliteSaver | None = None
 _conn: aiosqlite.Connection | None = None
 
@@ -52,11 +61,13 @@ async def get_checkpointer() -> AsyncSqliteSaver:
     try:
         LOGGER.info("Initializing LangGraph checkpointer at %s", db_path)
         # Add timeout to prevent hanging on DB initialization
-        _conn = await asyncio.wait_for(aiosqlite.connect(str(db_path)), timeout=5.0)
+        async with asyncio.timeout(5.0):
+            _conn = await aiosqlite.connect(str(db_path))
         _saver = AsyncSqliteSaver(_conn)
         
         # Initialize tables (with timeout)
-        await asyncio.wait_for(_saver.setup(), timeout=5.0)
+        async with asyncio.timeout(5.0):
+            await _saver.setup()
         
         return _saver
     except asyncio.TimeoutError:
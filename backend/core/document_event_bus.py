@@ -1,19 +1,29 @@
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 from uuid import UUID
 
+import orjson
 from pydantic import BaseModel, Field
 
 from backend.core.document_ws_manager import get_document_ws_manager
-from backend.memory.db import get_session
+from backend.core.event_writer import EventWriter
 from backend.memory import utils as db_utils
 from backend.utils.logging import get_logger
 
 LOGGER = get_logger(__name__)
 
+# Bound once: saves the attribute lookups on every emitted event
+_UTC = timezone.utc
+_now = datetime.now
+
+# Events are persisted in batches by one background task
+_writer = EventWriter("document", db_utils.record_document_events_bulk)
+
+# Shared default for events without data; treated as read-only
+_EMPTY_DATA: Dict[str, Any] = {}
+
 class DocumentEventPayload(BaseModel):
     type: str = Field(default="event")
     timestamp: str
@@ -32,37 +42,40 @@ async def emit_document_event(
     data: Optional[Dict[str, Any]] = None,
     persist: bool = True,
 ) -> None:
-    payload = DocumentEventPayload(
-        timestamp=datetime.now(timezone.utc).isoformat(),
-        project_id=document_id,
-        agent=agent,
-        level=level,
-        msg=msg,
-        data=data or {},
-    )
+    event_data = data or _EMPTY_DATA
 
-    # WS best-effort
-    try:
-        await get_document_ws_manager().broadcast(document_id, payload.model_dump())
-    except Exception:
-        LOGGER.exception("Failed to broadcast document WS event for %s", document_id)
+    # WS best-effort: only built and encoded when someone is watching; publish
+    # just queues for the manager's per-document writer task
+    manager = get_document_ws_manager()
+    if manager.has_connections(document_id):
+        payload = DocumentEventPayload(
+            timestamp=_now(_UTC).isoformat(timespec="milliseconds"),
+            project_id=document_id,
+            agent=agent,
+            level=level,
+            msg=msg,
+            data=event_data,
+        )
+        try:
+            manager.publish(
+                document_id, orjson.dumps(payload.model_dump(), default=str, option=orjson.OPT_NON_STR_KEYS)
+            )
+        except Exception:
+            LOGGER.exception("Failed to broadcast document WS event for %s", document_id)
 
     if not persist:
         return
 
-    async def _persist() -> None:
-        try:
-            async with get_session() as session:
-                await db_utils.record_document_event(
-                    session,
-                    UUID(document_id),
-                    msg,
-                    agent=agent,
-                    level=level,
-                    data=data or {},
-                )
-        except Exception:
-            LOGGER.exception("Failed to persist document event for %s", document_id)
+    _writer.put({
+        "document_id": UUID(document_id),
+        "agent": agent,
+        "level": level,
+        "message": msg,
+        "data": event_data,
+        "timestamp": datetime.utcnow(),
+    })
 
-    asyncio.create_task(_persist())
+async def flush_document_events() -> None:
+    """Persist document events still queued; called on shutdown."""
+    await _writer.flush()
 
@@ -10,6 +10,7 @@ from langgraph.graph import END, StateGraph
 
 from backend.core.document_state import DocumentState
 from backend.core.document_event_bus import emit_document_event
+from backend.core.persona import resolve_persona_prompt
 from backend.llm.adapter import get_llm_adapter
 from backend.memory.db import get_session
 from backend.memory import utils as db_utils
@@ -191,6 +192,22 @@ def _latex_system_prompt(preset: Optional[str], persona_prompt: Optional[str] =
     )
 
 
+async def resolve_persona_node(state: DocumentState) -> Dict[str, Any]:
+    """Resolve the custom agent / team persona inside the workflow, not the request."""
+    if state.get("persona_prompt") is not None:
+        return {}
+    custom_agent_id = state.get("custom_agent_id")
+    team_id = state.get("team_id")
+    if not (custom_agent_id or team_id):
+        return {}
+    try:
+        persona_prompt = await resolve_persona_prompt(custom_agent_id, team_id)
+    except Exception:
+        LOGGER.debug("Failed to resolve persona prompt for document %s", state["document_id"], exc_info=True)
+        return {}
+    return {"persona_prompt": persona_prompt}
+
+
 async def plan_node(state: DocumentState) -> Dict[str, Any]:
     document_id = state["document_id"]
     await emit_document_event(document_id, "Planning document outline...", agent="latex_writer")
@@ -670,13 +687,15 @@ def _should_design(state: DocumentState) -> Literal["designer_node", "compile_no
 
 def create_document_graph(checkpointer: BaseCheckpointSaver):
     workflow = StateGraph(DocumentState)
+    workflow.add_node("resolve_persona_node", resolve_persona_node)
     workflow.add_node("plan_node", plan_node)
     workflow.add_node("write_node", write_node)
     workflow.add_node("review_node", review_node)
     workflow.add_node("designer_node", designer_node)
     workflow.add_node("compile_node", compile_node)
 
-    workflow.set_entry_point("plan_node")
+    workflow.set_entry_point("resolve_persona_node")
+    workflow.add_edge("resolve_persona_node", "plan_node")
     workflow.add_edge("plan_node", "write_node")
     workflow.add_edge("write_node", "review_node")
 
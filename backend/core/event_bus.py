@@ -1,71 +1,150 @@
 from __future__ import annotations
 
-import asyncio
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+import msgspec
 
+from backend.core.event_writer import EventWriter
 from backend.core.ws_manager import get_ws_manager
-from backend.memory.db import get_session
 from backend.memory import utils as db_utils
-from backend.utils.logging import get_logger
+from backend.utils.logging import get_logger, trace_context
 
 LOGGER = get_logger(__name__)
 
-class ProjectEvent(BaseModel):
-    type: str = Field(default="event")
+# Bound once: saves the attribute lookups on every emitted event
+_UTC = timezone.utc
+_now = datetime.now
+
+# Events are persisted in batches by one background task
+_writer = EventWriter("project", db_utils.record_events_bulk)
+
+# Shared default for events without data; treated as read-only
+_EMPTY_DATA: Dict[str, Any] = {}
+
+# Token bucket per project for high-volume progress events (``sampled=True``):
+# sustained rate and burst size. Errors are never sampled.
+SAMPLED_EVENTS_PER_SEC = 20.0
+_SAMPLED_BURST = 40.0
+_buckets: Dict[str, Tuple[float, float]] = {}  # project_id -> (tokens, last refill)
+
+def _take_token(project_id: str) -> bool:
+    now = time.monotonic()
+    tokens, last = _buckets.get(project_id, (_SAMPLED_BURST, now))
+    tokens = min(_SAMPLED_BURST, tokens + (now - last) * SAMPLED_EVENTS_PER_SEC)
+    allowed = tokens >= 1.0
+    if len(_buckets) > 1024 and project_id not in _buckets:
+        # Idle buckets are full anyway; dropping them only resets to the burst size
+        _buckets.clear()
+    _buckets[project_id] = (tokens - 1.0 if allowed else tokens, now)
+    return allowed
+
+class ProjectEvent(msgspec.Struct, kw_only=True):
+    type: str = "event"
     timestamp: str
     project_id: str
     agent: str
-    level: str = Field(default="info")
+    level: str = "info"
     msg: str
-    data: Dict[str, Any] = Field(default_factory=dict)
+    data: Dict[str, Any] = msgspec.field(default_factory=dict)
 
-async def emit_event(
-    project_id: str,
-    msg: str,
-    *,
-    agent: str,
-    level: str = "info",
-    data: Optional[Dict[str, Any]] = None,
-    persist: bool = True,
-) -> None:
-    payload = ProjectEvent(
-        timestamp=datetime.now(timezone.utc).isoformat(),
+# Encodes straight to JSON bytes; unknown types fall back to str like json.dumps(default=str)
+_ENCODER = msgspec.json.Encoder(enc_hook=str)
+
+# Event timestamps have millisecond precision, so one formatted string serves
+# every event emitted within the same millisecond: [iso string, monotonic time]
+_ts_cache: List[Any] = ["", -1.0]
+
+def _now_iso() -> str:
+    now = time.monotonic()
+    if now - _ts_cache[1] >= 0.001:
+        _ts_cache[0] = _now(_UTC).isoformat(timespec="milliseconds")
+        _ts_cache[1] = now
+    return _ts_cache[0]
+
+def _resolve_project(project_id: Optional[str], msg: str) -> Optional[str]:
+    if project_id is None:
+        # Inside a traced graph node the project comes from the trace context
+        project_id = trace_context.get().get("project_id")
+        if project_id is None:
+            LOGGER.debug("Dropping event without project context: %s", msg[:100])
+    return project_id
+
+def _build_payload(project_id: str, msg: str, agent: str, level: str, data: Dict[str, Any]) -> ProjectEvent:
+    return ProjectEvent(
+        timestamp=_now_iso(),
         project_id=project_id,
         agent=agent,
         level=level,
         msg=msg,
-        data=data or {},
+        data=data,
     )
 
-    # WS (best effort)
+def _schedule_persist(project_id: str, msg: str, agent: str, level: str, data: Dict[str, Any]) -> None:
+    # DB (fire and forget; do not block workflow on DB errors)
+    _writer.put({
+        "project_id": UUID(project_id),
+        "agent": agent,
+        "level": level,
+        "message": msg,
+        "data": data,
+        "timestamp": datetime.utcnow(),
+    })
+
+async def flush_events() -> None:
+    """Persist project events still queued; called on shutdown."""
+    await _writer.flush()
+
+def _publish(project_id: str, msg: str, agent: str, level: str, data: Dict[str, Any]) -> None:
+    # WS (best effort): only encoded when someone is watching; the manager's
+    # per-project writer task does the socket I/O
+    manager = get_ws_manager()
+    if not manager.has_connections(project_id):
+        return
     try:
-        payload_dict = payload.model_dump()
-        LOGGER.debug("Broadcasting WS event for project %s: %s", project_id, payload_dict.get("msg", "")[:100])
-        await get_ws_manager().broadcast(project_id, payload_dict)
+        manager.publish(project_id, _ENCODER.encode(_build_payload(project_id, msg, agent, level, data)))
     except Exception as e:
         LOGGER.exception("Failed to broadcast WS event for project %s: %s", project_id, e)
 
-    # DB (fire and forget; do not block workflow on DB errors)
-    if not persist:
-        return
+async def emit_event(
+    project_id: Optional[str],
+    msg: str,
+    *,
+    agent: str,
+    level: str = "info",
+    data: Optional[Dict[str, Any]] = None,
+    persist: bool = True,
+    sampled: bool = False,
+) -> None:
+    # Kept awaitable for existing callers; delivery is queued, nothing waits here
+    emit_event_nowait(
+        project_id, msg, agent=agent, level=level, data=data, persist=persist, sampled=sampled
+    )
 
-    async def _persist() -> None:
-        try:
-            async with get_session() as session:
-                await db_utils.record_event(
-                    session,
-                    UUID(project_id),
-                    msg,
-                    agent=agent,
-                    level=level,
-                    data=data or {},
-                )
-        except Exception:
-            LOGGER.exception("Failed to persist event for project %s", project_id)
-
-    asyncio.create_task(_persist())
+def emit_event_nowait(
+    project_id: Optional[str],
+    msg: str,
+    *,
+    agent: str,
+    level: str = "info",
+    data: Optional[Dict[str, Any]] = None,
+    persist: bool = True,
+    sampled: bool = False,
+) -> None:
+    """Synchronous :func:`emit_event` for callers outside a coroutine or that
+    should not yield to the loop.
 
+    Replaces ``asyncio.create_task(emit_event(...))``; delivery and persistence
+    are queued either way. Must be called from the event loop thread.
+    """
+    project_id = _resolve_project(project_id, msg)
+    if project_id is None:
+        return
+    if sampled and level != "error" and not _take_token(project_id):
+        return
+    event_data = data or _EMPTY_DATA
+    _publish(project_id, msg, agent, level, event_data)
+    if persist:
+        _schedule_persist(project_id, msg, agent, level, event_data)
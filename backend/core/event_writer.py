@@ -0,0 +1,92 @@
+"""Batched background persistence for event rows.
+
+Event buses hand rows to an :class:`EventWriter` instead of spawning a task and
+a session per event: one long-lived task drains the queue and writes each batch
+with a single INSERT and commit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.memory.db import get_session
+from backend.utils.logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+Row = Dict[str, Any]
+
+# Up to BATCH_MAX rows per INSERT, flushed FLUSH_INTERVAL_S after the first pending row
+BATCH_MAX = 200
+FLUSH_INTERVAL_S = 0.1
+# Queued by flush(): the writer persists what it holds and exits
+_STOP = None
+
+
+class EventWriter:
+    def __init__(self, name: str, write: Callable[[AsyncSession, List[Row]], Awaitable[None]]) -> None:
+        self._name = name
+        self._write_rows = write
+        self._queue: Optional[asyncio.Queue[Optional[Row]]] = None
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def put(self, row: Row) -> None:
+        """Queue a row for the next batch; never blocks."""
+        if self._task is None or self._task.done():
+            # First row, or the loop that owned the previous writer is gone
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(self._queue), name=f"{self._name}-writer")
+        self._queue.put_nowait(row)
+
+    async def flush(self) -> None:
+        """Stop the writer task and persist whatever it has not written yet."""
+        task, queue = self._task, self._queue
+        if task is None or queue is None:
+            return
+        # Later puts start a fresh writer instead of feeding this one
+        self._task = None
+        if not task.done():
+            # The writer persists the batch it is holding, then returns at the sentinel
+            queue.put_nowait(_STOP)
+            await task
+        # Rows left behind by a writer that died
+        while not queue.empty():
+            rows: List[Row] = []
+            self._drain(queue, rows)
+            if rows:
+                await self._persist(rows)
+
+    @staticmethod
+    def _drain(queue: "asyncio.Queue[Optional[Row]]", rows: List[Row]) -> bool:
+        """Move up to BATCH_MAX rows into ``rows``; True if the stop sentinel was taken."""
+        while len(rows) < BATCH_MAX and not queue.empty():
+            row = queue.get_nowait()
+            if row is _STOP:
+                return True
+            rows.append(row)
+        return False
+
+    async def _persist(self, rows: List[Row]) -> None:
+        try:
+            async with get_session() as session:
+                await self._write_rows(session, rows)
+        except Exception:
+            LOGGER.exception("Failed to persist %d %s events", len(rows), self._name)
+
+    async def _run(self, queue: "asyncio.Queue[Optional[Row]]") -> None:
+        while True:
+            first = await queue.get()
+            stop = first is _STOP
+            rows: List[Row] = [] if stop else [first]
+            if not stop and queue.qsize() < BATCH_MAX - 1:
+                # Let the rest of the burst arrive before paying for a session
+                await asyncio.sleep(FLUSH_INTERVAL_S)
+            if not stop:
+                stop = self._drain(queue, rows)
+            if rows:
+                await self._persist(rows)
+            if stop:
+                return
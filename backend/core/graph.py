@@ -1,30 +1,38 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+from functools import lru_cache, partial
+from operator import itemgetter
 from typing import Any, Dict, List, Literal
 
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.base import BaseCheckpointSaver
 
-from backend.agents.ceo import CEOAgent
-from backend.agents.developer import DeveloperAgent
-from backend.agents.researcher import ResearcherAgent
-from backend.agents.tester import TesterAgent
-from backend.core.state import ProjectState
+from backend.core.state import ProjectState, build_context
 from backend.core.event_bus import emit_event
-from backend.utils.formatter import CodeFormatter
-from backend.memory.db import get_session
-from backend.memory import utils as db_utils
 from backend.settings import get_settings
-from backend.utils.logging import get_logger
+from backend.utils.logging import get_logger, with_trace
 from backend.llm.concurrency import get_llm_semaphore
 
 LOGGER = get_logger(__name__)
 
+# State fields read by research_node/plan_node, fetched in one pass each
+# (map(state.get, ...) and itemgetter run the lookups in C)
+_RESEARCH_KEYS = ("description", "target", "tech_stack", "research_queries")
+_PLAN_REQUIRED = itemgetter("description", "target")
+_PLAN_OPTIONAL = ("persona_prompt", "agent_preset", "tech_stack", "research_results", "research_queries")
+
 def _build_research_query(description: str, target: str, tech_stack: str | None = None) -> str:
-    desc = (description or "").strip()
-    tgt = (target or "").strip()
-    stack = (tech_stack or "").strip()
+    # Normalize None to "" here so the cache key is canonical
+    return _research_query(description or "", target or "", tech_stack or "")
+
+# plan_node and research_node build the same query for a project
+@lru_cache(maxsize=256)
+def _research_query(description: str, target: str, tech_stack: str) -> str:
+    desc = description.strip()
+    tgt = target.strip()
+    stack = tech_stack.strip()
     parts = [desc]
     if stack:
         parts.append(f"tech stack {stack}")
@@ -39,15 +47,14 @@ async def research_node(state: ProjectState) -> Dict[str, Any]:
     if not getattr(settings, "enable_web_search", True):
         return {}
 
-    description = state.get("description", "")
-    target = state.get("target", "")
-    tech_stack = state.get("tech_stack")
+    description, target, tech_stack, prev_queries = map(state.get, _RESEARCH_KEYS)
     query = _build_research_query(description, target, tech_stack)
 
     await emit_event(project_id, f"Research: {query}", agent="researcher")
 
     try:
         LOGGER.info("Creating ResearcherAgent for project %s", project_id)
+        from backend.agents.researcher import ResearcherAgent
         researcher = ResearcherAgent()
         LOGGER.info("ResearcherAgent created successfully for project %s", project_id)
     except Exception as e:
@@ -57,10 +64,10 @@ async def research_node(state: ProjectState) -> Dict[str, Any]:
         raise RuntimeError(error_msg)
     # Add timeout to prevent blocking workflow (15s max)
     try:
-        payload = await asyncio.wait_for(
-            researcher.search(query, project_id=project_id, max_results=getattr(settings, "max_search_results", 5)),
-            timeout=15.0
-        )
+        async with asyncio.timeout(15.0):
+            payload = await researcher.search(
+                query, project_id=project_id, max_results=getattr(settings, "max_search_results", 5)
+            )
     except asyncio.TimeoutError:
         LOGGER.warning("Research timed out after 15s, continuing without results")
         await emit_event(project_id, "Research timed out, continuing...", agent="researcher", level="warning")
@@ -74,106 +81,114 @@ async def research_node(state: ProjectState) -> Dict[str, Any]:
     results = payload.get("results", []) or []
     if payload.get("cached"):
         await emit_event(project_id, "Research cache hit", agent="researcher")
-    for r in results[: min(5, len(results))]:
-        title = str(r.get("title", "")).strip()
-        url = str(r.get("url", "")).strip()
-        if title and url:
-            await emit_event(project_id, f"- {title} ({url})", agent="researcher")
-        elif title:
-            await emit_event(project_id, f"- {title}", agent="researcher")
-
-    prev_queries = list(state.get("research_queries") or [])
+    # One multi-line event for the top snippets instead of one WS frame + DB row each
+    items = [
+        {"title": title, "url": str(r.get("url", "")).strip()}
+        for r in results[:5]
+        if (title := str(r.get("title", "")).strip())
+    ]
+    if items:
+        lines = "\n".join(f"- {i['title']} ({i['url']})" if i["url"] else f"- {i['title']}" for i in items)
+        await emit_event(project_id, f"Research results:\n{lines}", agent="researcher", data={"items": items})
+
+    prev_queries = list(prev_queries or [])
     if query not in prev_queries:
         prev_queries.append(query)
 
     return {"research_results": payload, "research_queries": prev_queries}
 
+async def _pre_plan_research(project_id: str, query: str, settings: Any) -> Dict[str, Any] | None:
+    try:
+        LOGGER.info("Creating ResearcherAgent for pre-plan research for project %s", project_id)
+        from backend.agents.researcher import ResearcherAgent
+        researcher = ResearcherAgent()
+    except Exception as e:
+        LOGGER.warning("Failed to create ResearcherAgent for pre-plan research: %s, skipping", e)
+        return None
+    try:
+        # Fast timeout (5s) - if it takes longer, skip pre-plan research
+        async with asyncio.timeout(5.0):
+            return await researcher.search(
+                query, project_id=project_id, max_results=getattr(settings, "max_search_results", 5)
+            )
+    except asyncio.TimeoutError:
+        LOGGER.debug("Pre-plan research timed out (skipping, will use research_node)")
+    except Exception as e:
+        LOGGER.debug("Pre-plan research failed: %s (skipping)", e)
+    return None
+
 async def plan_node(state: ProjectState) -> Dict[str, Any]:
     project_id = state["project_id"]
-    LOGGER.info("=" * 60)
-    LOGGER.info("PLAN_NODE CALLED: project_id=%s", project_id)
-    LOGGER.info("State keys: %s", list(state.keys()))
-    LOGGER.info("=" * 60)
+    LOGGER.info("plan_node: project_id=%s", project_id)
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug("plan_node state keys: %s", list(state.keys()))
     
-    description = state["description"]
-    target = state["target"]
-    persona_prompt = state.get("persona_prompt", "") or ""
-    agent_preset = state.get("agent_preset", "") or ""
+    description, target = _PLAN_REQUIRED(state)
+    persona_prompt, agent_preset, tech_stack, research_payload, research_queries = map(state.get, _PLAN_OPTIONAL)
+    persona_prompt = persona_prompt or ""
+    agent_preset = agent_preset or ""
+    research_queries = list(research_queries or [])
     settings = get_settings()
 
-    await emit_event(project_id, "Planning project architecture...", agent="ceo")
-    
-    # Log agent selection for debugging
-    if agent_preset:
-        LOGGER.info("CEO planning with agent_preset=%s", agent_preset)
-        await emit_event(project_id, f"Using agent: {agent_preset}", agent="ceo", level="info")
-
-    # Test LLM adapter before starting
-    try:
-        from backend.llm.adapter import get_llm_adapter
-        adapter = get_llm_adapter()
-        LOGGER.info("LLM adapter ready: %s", type(adapter).__name__)
-    except Exception as e:
-        error_msg = f"LLM adapter not ready: {str(e)}"
-        LOGGER.error(error_msg)
-        await emit_event(project_id, error_msg, agent="ceo", level="error")
-        raise RuntimeError(error_msg)
+    # Optional pre-planning research, started first so the search is in flight
+    # while the CEO is set up. Never blocks planning for long: research_node
+    # covers it if it is slow.
+    research_query = None
+    research_task = None
+    if getattr(settings, "enable_web_search", True) and not research_payload:
+        research_query = _build_research_query(description, target, tech_stack)
+        research_task = asyncio.create_task(_pre_plan_research(project_id, research_query, settings))
 
     try:
-        LOGGER.info("Creating CEOAgent for project %s", project_id)
-        # Pass semaphore to CEO for rate limit control
-        semaphore = get_llm_semaphore()
-        ceo = CEOAgent(semaphore)
-        LOGGER.info("CEOAgent created successfully for project %s", project_id)
-    except Exception as e:
-        error_msg = f"Failed to create CEOAgent: {str(e)}"
-        LOGGER.exception(error_msg)
-        await emit_event(project_id, error_msg, agent="system", level="error")
-        raise RuntimeError(error_msg)
+        await emit_event(project_id, "Planning project architecture...", agent="ceo")
     
-    research_payload = state.get("research_results")
-    research_queries = list(state.get("research_queries") or [])
+        # Log agent selection for debugging
+        if agent_preset:
+            LOGGER.info("CEO planning with agent_preset=%s", agent_preset)
+            await emit_event(project_id, f"Using agent: {agent_preset}", agent="ceo", level="info")
 
-    # Optional pre-planning research (non-blocking, with short timeout)
-    # Don't block planning if research is slow - it will happen in research_node anyway
-    if getattr(settings, "enable_web_search", True) and not research_payload:
+        # Test LLM adapter before starting
         try:
-            q = _build_research_query(description, target, state.get("tech_stack"))
-            try:
-                LOGGER.info("Creating ResearcherAgent for pre-plan research for project %s", project_id)
-                researcher = ResearcherAgent()
-                LOGGER.info("ResearcherAgent created successfully for pre-plan research for project %s", project_id)
-            except Exception as e:
-                LOGGER.warning("Failed to create ResearcherAgent for pre-plan research: %s, skipping", e)
-                research_payload = None
-            else:
-                # Fast timeout (5s) - if it takes longer, skip pre-plan research
-                # Research will happen in research_node anyway
-                research_payload = await asyncio.wait_for(
-                    researcher.search(q, project_id=project_id, max_results=getattr(settings, "max_search_results", 5)),
-                    timeout=5.0
-                )
-                if q not in research_queries:
-                    research_queries.append(q)
-        except asyncio.TimeoutError:
-            LOGGER.debug("Pre-plan research timed out (skipping, will use research_node)")
-            research_payload = None
+            from backend.llm.adapter import get_llm_adapter
+            adapter = get_llm_adapter()
+            LOGGER.info("LLM adapter ready: %s", type(adapter).__name__)
         except Exception as e:
-            LOGGER.debug("Pre-plan research failed: %s (skipping)", e)
-            research_payload = None
+            error_msg = f"LLM adapter not ready: {str(e)}"
+            LOGGER.error(error_msg)
+            await emit_event(project_id, error_msg, agent="ceo", level="error")
+            raise RuntimeError(error_msg)
+
+        try:
+            LOGGER.info("Creating CEOAgent for project %s", project_id)
+            # Pass semaphore to CEO for rate limit control
+            semaphore = get_llm_semaphore()
+            from backend.agents.ceo import CEOAgent
+            ceo = CEOAgent(semaphore)
+            LOGGER.info("CEOAgent created successfully for project %s", project_id)
+        except Exception as e:
+            error_msg = f"Failed to create CEOAgent: {str(e)}"
+            LOGGER.exception(error_msg)
+            await emit_event(project_id, error_msg, agent="system", level="error")
+            raise RuntimeError(error_msg)
+    
+        if research_task is not None:
+            research_payload = await research_task
+            if research_payload is not None and research_query not in research_queries:
+                research_queries.append(research_query)
+    finally:
+        if research_task is not None:
+            research_task.cancel()
     
     # Add timeout to prevent hanging on rate limits
     try:
-        plan = await asyncio.wait_for(
-            ceo.plan(
+        async with asyncio.timeout(180.0):
+            plan = await ceo.plan(
                 description,
                 target,
                 persona_prompt=persona_prompt,
                 agent_preset=agent_preset,
                 research_results=research_payload,
-            ),
-            timeout=180.0,
-        )
+            )
     except asyncio.TimeoutError:
         error_msg = "CEO plan generation timed out (exceeded 180s). This may be due to rate limits."
         LOGGER.error(error_msg)
@@ -197,7 +212,8 @@ async def plan_node(state: ProjectState) -> Dict[str, Any]:
 
     await emit_event(project_id, f"Plan generated with {len(plan)} steps", agent="ceo")
     LOGGER.info("Plan node completed: %d steps, tech_stack=%s", len(plan), tech_stack)
-    LOGGER.info("Returning from plan_node with plan: %s", [s.get("name", "unknown") for s in plan[:3]])
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug("plan_node first steps: %s", [s.get("name", "unknown") for s in plan[:3]])
     
     result = {
         "plan": plan, 
@@ -206,7 +222,6 @@ async def plan_node(state: ProjectState) -> Dict[str, Any]:
         "research_queries": research_queries,
         "status": "generating"
     }
-    LOGGER.info("plan_node returning state keys: %s", list(result.keys()))
     return result
 
 async def generate_node(state: ProjectState) -> Dict[str, Any]:
@@ -214,11 +229,9 @@ async def generate_node(state: ProjectState) -> Dict[str, Any]:
     plan = state.get("plan", [])
     current_idx = state.get("current_step_idx", 0)
     
-    LOGGER.info("=" * 60)
-    LOGGER.info("GENERATE_NODE CALLED: project_id=%s", project_id)
-    LOGGER.info("Plan length: %d, current_idx: %d", len(plan), current_idx)
-    LOGGER.info("Plan content: %s", [s.get("name", "unknown") for s in plan[:5]])
-    LOGGER.info("=" * 60)
+    LOGGER.info("generate_node: project_id=%s, plan length=%d, current_idx=%d", project_id, len(plan), current_idx)
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug("generate_node plan content: %s", [s.get("name", "unknown") for s in plan[:5]])
     
     await emit_event(project_id, "Generate node entered", agent="system", level="info")
     
@@ -243,37 +256,21 @@ async def generate_node(state: ProjectState) -> Dict[str, Any]:
     # Ideally, we should yield control back to graph after each step 
     # if we want granular checkpointing per step.
     
-    settings = get_settings()
     semaphore = get_llm_semaphore()
     try:
-        LOGGER.info("Creating DeveloperAgent for project %s", project_id)
-        developer = DeveloperAgent(semaphore)
-        LOGGER.info("DeveloperAgent created successfully for project %s", project_id)
+        from backend.agents.developer import get_developer
+        developer = get_developer(semaphore)
     except Exception as e:
-        error_msg = f"Failed to create DeveloperAgent: {str(e)}"
+        error_msg = f"Failed to get DeveloperAgent: {str(e)}"
         LOGGER.exception(error_msg)
         await emit_event(project_id, error_msg, agent="system", level="error")
         raise RuntimeError(error_msg)
     from backend.core.orchestrator import orchestrator
     stop_event = orchestrator.get_stop_event(project_id)
 
-    # Helper for broadcast
-    async def on_message(target: str, msg: str) -> None:
-        await emit_event(project_id, msg, agent="developer", data={"target": target})
-
-    context = {
-        "project_id": project_id,
-        "title": state["title"],
-        "description": state["description"],
-        "target": state["target"],
-        "tech_stack": state.get("tech_stack"),
-        "agent_preset": state.get("agent_preset"),
-        "custom_agent_id": state.get("custom_agent_id"),
-        "team_id": state.get("team_id"),
-        "persona_prompt": state.get("persona_prompt"),
-        "research_results": state.get("research_results"),
-        "research_queries": state.get("research_queries"),
-    }
+    on_message = partial(_on_developer_message, project_id)
+
+    context = build_context(state)
 
     from backend.core.step_utils import group_steps
     remaining_steps = plan[current_idx:]
@@ -295,18 +292,30 @@ async def generate_node(state: ProjectState) -> Dict[str, Any]:
         await emit_event(project_id, group_msg, agent="system")
         
         try:
-            # Sequential execution within groups to be less aggressive with LLM limits
-            for step in steps:
-                if stop_event.is_set():
-                    break
-                await _run_single_step(developer, step, context, stop_event, on_message)
-            
+            # Steps in a group are independent: run them concurrently (the global
+            # LLM semaphore still caps in-flight requests). Each step reports its own
+            # completion as it finishes, and the first failure cancels its siblings.
+            async with asyncio.TaskGroup() as tg:
+                for step in steps:
+                    if stop_event.is_set():
+                        break
+                    tg.create_task(_run_single_step(developer, step, context, stop_event, on_message))
+            # A step that saw the stop raises CancelledError, which TaskGroup
+            # treats as that child being cancelled rather than as a failure
+            if stop_event.is_set():
+                raise asyncio.CancelledError()
+
             await emit_event(project_id, f"Group {group_id} completed", agent="system")
             LOGGER.info("Group %s completed successfully", group_id)
         except Exception as e:
-            LOGGER.error("Group %s failed: %s", group_id, e, exc_info=True)
-            await emit_event(project_id, f"Group {group_id} failed: {str(e)[:200]}", agent="system", level="error")
-            raise
+            # Surface the failing step rather than the TaskGroup wrapper; log
+            # every failed step, since only the first is re-raised
+            errors = e.exceptions if isinstance(e, ExceptionGroup) else (e,)
+            for failed in errors:
+                LOGGER.error("Group %s failed: %s", group_id, failed, exc_info=failed)
+            err = errors[0]
+            await emit_event(project_id, f"Group {group_id} failed: {str(err)[:200]}", agent="system", level="error")
+            raise err
         
         # Update progress
         current_idx += len(steps)
@@ -316,8 +325,11 @@ async def generate_node(state: ProjectState) -> Dict[str, Any]:
         "status": "testing"
     }
 
+async def _on_developer_message(project_id: str, target: str, msg: str) -> None:
+    await emit_event(project_id, msg, agent="developer", data={"target": target})
+
 async def _run_single_step(developer, step, context, stop_event, on_message):
-    project_id = context["project_id"]
+    project_id = context.project_id
     step_name = step.get("name", "unknown")
     step_payload = step.get("payload", {})
     files_spec = step_payload.get("files", [])
@@ -326,11 +338,14 @@ async def _run_single_step(developer, step, context, stop_event, on_message):
         raise asyncio.CancelledError()
 
     LOGGER.info("Running step: %s, files: %d", step_name, len(files_spec))
-    await emit_event(project_id, f"Step {step_name} started ({len(files_spec)} files)", agent="developer")
+    # Per-step progress is sampled; group boundaries and failures always go out
+    await emit_event(
+        project_id, f"Step {step_name} started ({len(files_spec)} files)", agent="developer", level="debug", sampled=True
+    )
     
     try:
         await developer.run(step, context, stop_event, on_message)
-        await emit_event(project_id, f"Step {step_name} finished", agent="developer")
+        await emit_event(project_id, f"Step {step_name} finished", agent="developer", level="debug", sampled=True)
         LOGGER.info("Step %s completed successfully", step_name)
     except Exception as e:
         LOGGER.error("Step %s failed: %s", step_name, e, exc_info=True)
@@ -343,6 +358,7 @@ async def test_node(state: ProjectState) -> Dict[str, Any]:
     
     settings = get_settings()
     project_path = settings.projects_root / project_id
+    from backend.utils.formatter import CodeFormatter
     await CodeFormatter.format_project(project_path)
     
     await emit_event(project_id, "Running tests...", agent="tester")
@@ -351,6 +367,7 @@ async def test_node(state: ProjectState) -> Dict[str, Any]:
         LOGGER.info("Creating TesterAgent for project %s", project_id)
         # Pass semaphore to Tester for rate limit control
         semaphore = get_llm_semaphore()
+        from backend.agents.tester import TesterAgent
         tester = TesterAgent(semaphore)
         LOGGER.info("TesterAgent created successfully for project %s", project_id)
     except Exception as e:
@@ -358,19 +375,7 @@ async def test_node(state: ProjectState) -> Dict[str, Any]:
         LOGGER.exception(error_msg)
         await emit_event(project_id, error_msg, agent="system", level="error")
         raise RuntimeError(error_msg)
-    context = {
-        "project_id": project_id,
-        "title": state["title"],
-        "description": state["description"],
-        "target": state["target"],
-        "tech_stack": state.get("tech_stack"),
-        "agent_preset": state.get("agent_preset"),
-        "custom_agent_id": state.get("custom_agent_id"),
-        "team_id": state.get("team_id"),
-        "persona_prompt": state.get("persona_prompt"),
-        "research_results": state.get("research_results"),
-        "research_queries": state.get("research_queries"),
-    }
+    context = build_context(state)
     
     results = await tester.test_project(state["project_id"], context)
     
@@ -394,35 +399,23 @@ async def correct_node(state: ProjectState) -> Dict[str, Any]:
     settings = get_settings()
     semaphore = get_llm_semaphore()
     try:
-        LOGGER.info("Creating DeveloperAgent for project %s", project_id)
-        developer = DeveloperAgent(semaphore)
-        LOGGER.info("DeveloperAgent created successfully for project %s", project_id)
+        from backend.agents.developer import get_developer
+        developer = get_developer(semaphore)
     except Exception as e:
-        error_msg = f"Failed to create DeveloperAgent: {str(e)}"
+        error_msg = f"Failed to get DeveloperAgent: {str(e)}"
         LOGGER.exception(error_msg)
         await emit_event(project_id, error_msg, agent="system", level="error")
         raise RuntimeError(error_msg)
     from backend.core.orchestrator import orchestrator
     stop_event = orchestrator.get_stop_event(project_id)
     
-    context = {
-        "project_id": project_id,
-        "title": state["title"],
-        "description": state["description"],
-        "target": state["target"],
-        "tech_stack": state.get("tech_stack"),
-        "agent_preset": state.get("agent_preset"),
-        "custom_agent_id": state.get("custom_agent_id"),
-        "team_id": state.get("team_id"),
-        "persona_prompt": state.get("persona_prompt"),
-        "research_results": state.get("research_results"),
-        "research_queries": state.get("research_queries"),
-    }
+    context = build_context(state)
     
     await developer.auto_correct(context, issues, stop_event)
     
     # Re-format
     project_path = settings.projects_root / project_id
+    from backend.utils.formatter import CodeFormatter
     await CodeFormatter.format_project(project_path)
     
     return {
@@ -432,57 +425,47 @@ async def correct_node(state: ProjectState) -> Dict[str, Any]:
 
 async def finalize_node(state: ProjectState) -> Dict[str, Any]:
     project_id = state["project_id"]
-    from uuid import UUID
+    test_results = state["test_results"]
     
-    if state["test_results"] and not state["test_results"]["passed"]:
+    if test_results and not test_results["passed"]:
          await emit_event(project_id, "Max retries reached. Project finished with warnings.", agent="system", level="warning")
     else:
          await emit_event(project_id, "Project completed successfully!", agent="system")
-         
-    async with get_session() as session:
-        await db_utils.update_project_status(session, UUID(state["project_id"]), "done")
-        
+
+    # The orchestrator records "done" once the run reaches END
     return {"status": "done"}
 
 # --- Graph Construction ---
 
-def create_project_graph(checkpointer: BaseCheckpointSaver):
+def should_correct(state: ProjectState) -> Literal["correct_node", "finalize_node"]:
+    results = state.get("test_results", {})
+    passed = results.get("passed", False)
+    retries = state.get("retry_count", 0)
+    max_retries = 2 # Configurable
+    
+    if not passed and retries < max_retries:
+        return "correct_node"
+    return "finalize_node"
+
+def _build_workflow(enable_web_search: bool) -> StateGraph:
     workflow = StateGraph(ProjectState)
 
-    workflow.add_node("plan_node", plan_node)
-    workflow.add_node("research_node", research_node)
-    workflow.add_node("generate_node", generate_node)
-    workflow.add_node("test_node", test_node)
-    workflow.add_node("correct_node", correct_node)
-    workflow.add_node("finalize_node", finalize_node)
+    workflow.add_node("plan_node", with_trace("plan_node")(plan_node))
+    workflow.add_node("research_node", with_trace("research_node")(research_node))
+    workflow.add_node("generate_node", with_trace("generate_node")(generate_node))
+    workflow.add_node("test_node", with_trace("test_node")(test_node))
+    workflow.add_node("correct_node", with_trace("correct_node")(correct_node))
+    workflow.add_node("finalize_node", with_trace("finalize_node")(finalize_node))
 
     workflow.set_entry_point("plan_node")
 
-    def should_research(state: ProjectState) -> Literal["research_node", "generate_node"]:
-        settings = get_settings()
-        enable_search = getattr(settings, "enable_web_search", False)
-        project_id = state.get("project_id", "unknown")
-        LOGGER.info("should_research: project_id=%s, enable_web_search=%s", project_id, enable_search)
-        if enable_search:
-            LOGGER.info("Routing to research_node for project %s", project_id)
-            return "research_node"
-        LOGGER.info("Routing to generate_node for project %s", project_id)
-        return "generate_node"
-
-    workflow.add_conditional_edges("plan_node", should_research)
+    # Web search is a deployment-level switch, so routing after planning is
+    # decided here rather than per run. research_node stays registered either
+    # way so checkpoints taken under the other setting can still resume.
+    workflow.add_edge("plan_node", "research_node" if enable_web_search else "generate_node")
     workflow.add_edge("research_node", "generate_node")
     workflow.add_edge("generate_node", "test_node")
 
-    def should_correct(state: ProjectState) -> Literal["correct_node", "finalize_node"]:
-        results = state.get("test_results", {})
-        passed = results.get("passed", False)
-        retries = state.get("retry_count", 0)
-        max_retries = 2 # Configurable
-        
-        if not passed and retries < max_retries:
-            return "correct_node"
-        return "finalize_node"
-
     workflow.add_conditional_edges(
         "test_node",
         should_correct
@@ -490,5 +473,11 @@ def create_project_graph(checkpointer: BaseCheckpointSaver):
 
     workflow.add_edge("correct_node", "test_node")
     workflow.add_edge("finalize_node", END)
+    return workflow
 
-    return workflow.compile(checkpointer=checkpointer)
+# The graph topology never changes between runs; only the checkpointer does.
+_WORKFLOWS: Dict[bool, StateGraph] = {flag: _build_workflow(flag) for flag in (True, False)}
+
+def create_project_graph(checkpointer: BaseCheckpointSaver):
+    enable_web_search = bool(getattr(get_settings(), "enable_web_search", False))
+    return _WORKFLOWS[enable_web_search].compile(checkpointer=checkpointer)
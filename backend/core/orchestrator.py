@@ -1,50 +1,159 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
 from backend.core.state import ProjectState
-from backend.core.graph import create_project_graph
-from backend.core.checkpointer import get_checkpointer, close_checkpointer
 from backend.memory.db import get_session
 from backend.memory import utils as db_utils
-from backend.core.presets import get_preset_by_id
-from backend.memory.models import CustomAgent, Team, TeamAgentLink, TeamMember
+from backend.core.event_bus import emit_event, emit_event_nowait
+from backend.llm.adapter import get_llm_adapter
+from backend.settings import get_settings
 from backend.utils.logging import get_logger
 
 LOGGER = get_logger(__name__)
 
+INIT_RETRY_AFTER_S = 5.0
+
+def _thread_config(thread_id: str) -> Dict[str, Any]:
+    # Fresh per call: LangGraph merges run metadata into the config it is given
+    return {"configurable": {"thread_id": thread_id}}
+
 class Orchestrator:
+    __slots__ = (
+        "_compiled_graph",
+        "_init_lock",
+        "_stop_events",
+        "_tasks",
+        "_init_error",
+        "_init_error_ts",
+        "_start_queue",
+        "_workers",
+        "_stop_cancelled",
+        "_closing",
+    )
 
     def __init__(self) -> None:
         self._compiled_graph = None
         self._init_lock = asyncio.Lock()
         self._stop_events: dict[str, asyncio.Event] = {}
         self._tasks: dict[str, asyncio.Task[None]] = {}
-        
+        # Last graph init failure; callers fail fast for INIT_RETRY_AFTER_S
+        # instead of piling up behind the lock while the checkpointer DB is down
+        self._init_error: Exception | None = None
+        self._init_error_ts: float | None = None
+        # Fixed pool of long-lived workers pulling runs off one queue; it also
+        # caps concurrent workflows. Started on first use: no loop at import time.
+        self._start_queue: asyncio.Queue[Tuple[str, Optional[ProjectState]]] | None = None
+        self._workers: List[asyncio.Task[None]] = []
+        # Projects whose running worker got its one cancel from request_stop; only
+        # that cancel is absorbed, so the worker's cancel count returns to zero
+        self._stop_cancelled: set[str] = set()
+        self._closing = False
+
+    def _ensure_workers(self) -> asyncio.Queue[Tuple[str, Optional[ProjectState]]]:
+        if self._start_queue is None:
+            self._start_queue = asyncio.Queue()
+            self._workers = [
+                asyncio.create_task(self._worker_loop(), name=f"workflow-worker-{i}")
+                for i in range(get_settings().max_concurrent_workflows)
+            ]
+        return self._start_queue
+
+    async def _enqueue(self, project_id: str, state: Optional[ProjectState]) -> None:
+        queue = self._ensure_workers()
+        if queue.qsize() or len(self._tasks) >= len(self._workers):
+            LOGGER.info("Project %s queued (%d waiting for a workflow slot)", project_id, queue.qsize() + 1)
+            await self._set_status(UUID(project_id), "queued")
+            emit_event_nowait(project_id, "Waiting for a free workflow slot...", agent="system", level="info")
+        queue.put_nowait((project_id, state))
+
+    async def _worker_loop(self) -> None:
+        queue = self._start_queue
+        me = asyncio.current_task()
+        while True:
+            project_id, state = await queue.get()
+            try:
+                if self.get_stop_event(project_id).is_set():
+                    # Stopped while still queued
+                    await self._set_status(UUID(project_id), "stopped")
+                    continue
+                self._tasks[project_id] = me
+                await self._run_workflow(project_id, state)
+            except asyncio.CancelledError:
+                # request_stop cancels only the current run; anything else
+                # (shutdown, or a cancel it did not send) ends the worker
+                if self._closing or project_id not in self._stop_cancelled:
+                    raise
+            except Exception:
+                LOGGER.exception("Workflow worker failed on project %s", project_id)
+            finally:
+                if project_id in self._stop_cancelled:
+                    self._stop_cancelled.discard(project_id)
+                    # Absorb our cancel, also when the run swallowed it and returned
+                    if not self._closing and me.cancelling():
+                        me.uncancel()
+                self._forget(project_id, me)
+                queue.task_done()
+
+    def _raise_recent_init_error(self) -> None:
+        if self._init_error_ts is not None and time.monotonic() - self._init_error_ts < INIT_RETRY_AFTER_S:
+            raise self._init_error
+
     async def _get_graph(self):
+        # Fast path: once compiled, the graph is read without taking the lock
+        if self._compiled_graph is not None:
+            return self._compiled_graph
+        self._raise_recent_init_error()
         async with self._init_lock:
             if self._compiled_graph is None:
+                # Waiters queued behind a failed attempt fail fast too
+                self._raise_recent_init_error()
                 try:
-                    checkpointer = await asyncio.wait_for(get_checkpointer(), timeout=10.0)
+                    # LangGraph and the agent modules load on the first workflow,
+                    # not when the API imports the orchestrator
+                    from backend.core.checkpointer import get_checkpointer
+                    from backend.core.graph import create_project_graph
+                    async with asyncio.timeout(10.0):
+                        checkpointer = await get_checkpointer()
                     self._compiled_graph = create_project_graph(checkpointer)
                 except asyncio.TimeoutError:
                     LOGGER.error("Graph initialization timed out after 10s")
-                    raise RuntimeError("Graph initialization timeout")
+                    self._init_error = RuntimeError("Graph initialization timeout")
+                    self._init_error_ts = time.monotonic()
+                    raise self._init_error
+                except Exception as e:
+                    self._init_error, self._init_error_ts = e, time.monotonic()
+                    raise
+                self._init_error = self._init_error_ts = None
         return self._compiled_graph
 
     def get_stop_event(self, project_id: str) -> asyncio.Event:
+        """Stop flag for a running workflow.
+
+        Events are dropped when the workflow task finishes, so callers must not
+        hold on to one past the run that requested it.
+        """
         ev = self._stop_events.get(project_id)
         if ev is None:
-            ev = asyncio.Event()
-            self._stop_events[project_id] = ev
+            ev = self._stop_events[project_id] = asyncio.Event()
         return ev
 
+    def _forget(self, project_id: str, task: asyncio.Task[None]) -> None:
+        # A restarted run may already own the slot; only the finishing worker clears it
+        if self._tasks.get(project_id) is task:
+            del self._tasks[project_id]
+        if project_id not in self._tasks:
+            self._stop_events.pop(project_id, None)
+
     async def request_stop(self, project_id: str) -> None:
         self.get_stop_event(project_id).set()
         task = self._tasks.get(project_id)
-        if task and not task.done():
+        # One cancel per run: repeated requests must not stack on the worker
+        if task and not task.done() and project_id not in self._stop_cancelled:
+            self._stop_cancelled.add(project_id)
             task.cancel()
 
     async def async_start(
@@ -54,10 +163,6 @@ class Orchestrator:
         LOGGER.info("Starting project %s via LangGraph", project_str)
         
         try:
-            from backend.core.event_bus import emit_event
-            from backend.llm.adapter import get_llm_adapter
-            from backend.settings import get_settings
-            
             settings = get_settings()
             LOGGER.info("LLM mode: %s", settings.llm_mode)
             
@@ -69,9 +174,7 @@ class Orchestrator:
                 await emit_event(project_str, f"LLM initialization failed: {str(e)}", agent="system", level="error")
                 raise RuntimeError(f"LLM adapter initialization failed: {str(e)}")
             
-            asyncio.create_task(
-                emit_event(project_str, f"Starting project: {title}", agent="system", level="info")
-            )
+            emit_event_nowait(project_str, f"Starting project: {title}", agent="system", level="info")
 
             agent_preset: Optional[str] = None
             custom_agent_id: Optional[str] = None
@@ -80,83 +183,23 @@ class Orchestrator:
             
             async def _load_agent_config():
                 async with get_session() as session:
-                    from sqlalchemy import select
-                    project = await db_utils.get_project(session, project_id)
-                    if project is not None:
-                        agent_preset_val = getattr(project, "agent_preset", None)
-                        custom_agent_id_val = str(getattr(project, "custom_agent_id", None)) if getattr(project, "custom_agent_id", None) else None
-                        team_id_val = str(getattr(project, "team_id", None)) if getattr(project, "team_id", None) else None
-                        persona_prompt_val: Optional[str] = None
-
-                        if getattr(project, "custom_agent_id", None):
-                            res = await session.execute(
-                                select(CustomAgent).where(CustomAgent.id == project.custom_agent_id)
-                            )
-                            agent = res.scalar_one_or_none()
-                            if agent:
-                                tech = ", ".join(agent.tech_stack or [])
-                                persona_prompt_val = (
-                                    f"=== CUSTOM AGENT: {agent.name} ===\n"
-                                    f"{agent.prompt}\n"
-                                    + (f"\nTech Stack: {tech}\n" if tech else "")
-                                )
-                        elif getattr(project, "team_id", None):
-                            res = await session.execute(select(Team).where(Team.id == project.team_id))
-                            team = res.scalar_one_or_none()
-                            if team:
-                                res_members = await session.execute(
-                                    select(TeamMember).where(TeamMember.team_id == team.id)
-                                )
-                                members = list(res_members.scalars().all())
-                                custom_ids = {m.custom_agent_id for m in members if m.custom_agent_id}
-                                preset_ids = {m.preset_id for m in members if m.preset_id}
-
-                                res_links = await session.execute(
-                                    select(TeamAgentLink.agent_id).where(TeamAgentLink.team_id == team.id)
-                                )
-                                for row in res_links.all():
-                                    custom_ids.add(row[0])
-
-                                members_prompt = ""
-                                blocks = []
-
-                                for pid in sorted(preset_ids):
-                                    preset = get_preset_by_id(pid)
-                                    if not preset:
-                                        continue
-                                    tags = ", ".join(preset.tags or [])
-                                    blocks.append(
-                                        f"--- PRESET: {preset.name} ({preset.id}) ---\n"
-                                        f"{preset.persona_prompt}\n"
-                                        + (f"\nTags: {tags}\n" if tags else "")
-                                    )
-
-                                if custom_ids:
-                                    res_agents = await session.execute(
-                                        select(CustomAgent).where(CustomAgent.id.in_(sorted(custom_ids)))
-                                    )
-                                    custom_members = list(res_agents.scalars().all())
-                                    for m in custom_members:
-                                        tech = ", ".join(m.tech_stack or [])
-                                        blocks.append(
-                                            f"--- {m.name} ---\n{m.prompt}\n" + (f"\nTech Stack: {tech}\n" if tech else "")
-                                        )
-
-                                members_prompt = "\n\n".join(blocks)
-                                persona_prompt_val = (
-                                    f"=== TEAM: {team.name} ===\n"
-                                    + (f"{team.description}\n\n" if team.description else "")
-                                    + (members_prompt if members_prompt else "No members.\n")
-                                )
-
-                        return agent_preset_val, custom_agent_id_val, team_id_val, persona_prompt_val
-                return None, None, None, None
+                    config_row = await db_utils.get_project_agent_config(session, project_id)
+                if config_row is None:
+                    return None, None, None, None
+                agent_preset_val, custom_agent_uuid, team_uuid = config_row
+                if custom_agent_uuid is None and team_uuid is None:
+                    # Most projects: preset-only or no persona, nothing more to load
+                    return agent_preset_val, None, None, None
+                custom_agent_id_val = str(custom_agent_uuid) if custom_agent_uuid else None
+                team_id_val = str(team_uuid) if team_uuid else None
+                # Shared with the document graph; cached per custom agent/team
+                from backend.core.persona import resolve_persona_prompt
+                persona_prompt_val = await resolve_persona_prompt(custom_agent_id_val, team_id_val)
+                return agent_preset_val, custom_agent_id_val, team_id_val, persona_prompt_val
             
             try:
-                agent_preset, custom_agent_id, team_id, persona_prompt = await asyncio.wait_for(
-                    _load_agent_config(), 
-                    timeout=0.15
-                )
+                async with asyncio.timeout(0.15):
+                    agent_preset, custom_agent_id, team_id, persona_prompt = await _load_agent_config()
             except (asyncio.TimeoutError, Exception) as e:
                 LOGGER.debug("Using default agent config: %s", e)
 
@@ -180,16 +223,19 @@ class Orchestrator:
                 "status": "planning"
             }
             
-            task = asyncio.create_task(self._run_workflow(project_str, initial_state))
-            self._tasks[project_str] = task
-            task.add_done_callback(lambda _: self._tasks.pop(project_str, None))
+            await self._enqueue(project_str, initial_state)
         except Exception as e:
             LOGGER.exception("Failed to start project %s: %s", project_str, e)
-            async with get_session() as session:
-                await db_utils.update_project_status(session, project_id, "failed")
+            await self._set_status(project_id, "failed")
             raise
 
+    @staticmethod
+    async def _set_status(project_id: UUID, status: str) -> None:
+        async with get_session() as session:
+            await db_utils.update_project_status(session, project_id, status)
+
     async def _run_workflow(self, project_id: str, state: ProjectState = None):
+        project_uuid = UUID(project_id)
         try:
             LOGGER.info("Getting graph for project %s", project_id)
             try:
@@ -197,98 +243,123 @@ class Orchestrator:
                 LOGGER.info("Graph obtained successfully for project %s", project_id)
             except Exception as graph_error:
                 LOGGER.exception("Failed to get graph for project %s: %s", project_id, graph_error)
-                from backend.core.event_bus import emit_event
                 await emit_event(project_id, f"Failed to initialize workflow: {str(graph_error)[:200]}", agent="system", level="error")
-                async with get_session() as session:
-                    await db_utils.update_project_status(session, UUID(project_id), "failed")
+                await self._set_status(project_uuid, "failed")
                 return
             
-            config = {"configurable": {"thread_id": project_id}}
+            config = _thread_config(project_id)
             
             try:
-                async with get_session() as session:
-                    await db_utils.update_project_status(session, UUID(project_id), "running")
+                await self._set_status(project_uuid, "running")
                 LOGGER.info("Project status updated to 'running' for project %s", project_id)
             except Exception as status_error:
                 LOGGER.warning("Failed to update project status to 'running' for project %s: %s", project_id, status_error)
 
             LOGGER.info("Invoking graph for project %s with state keys: %s", project_id, list(state.keys()) if state else "None")
-            from backend.core.event_bus import emit_event
-            await emit_event(project_id, "Starting workflow...", agent="system", level="info")
-            
+            emit_event_nowait(project_id, "Starting workflow...", agent="system", level="info")
+        
+            # Each outcome below writes its terminal status exactly once, with the
+            # UUID parsed once above (finalize_node no longer writes "done" itself)
+            from backend.core.checkpointer import ASYNC_CHECKPOINT_KWARGS
             try:
-                LOGGER.info("Calling graph.ainvoke for project %s", project_id)
-                result = await asyncio.wait_for(
-                    graph.ainvoke(state, config=config),
-                    timeout=600.0
-                )
-                LOGGER.info("graph.ainvoke completed for project %s, result keys: %s", project_id, list(result.keys()) if result else "None")
-                
-                final_status = result.get("status", "done")
-                if final_status == "done":
-                    LOGGER.info("Workflow completed successfully for project %s, updating status to 'done'", project_id)
-                    async with get_session() as session:
-                        await db_utils.update_project_status(session, UUID(project_id), "done")
-                        await session.commit()
+                LOGGER.info("Streaming graph for project %s", project_id)
+                stop_event = self.get_stop_event(project_id)
+                finished = False
+                # Driving the graph step by step lets a stop request end the run at
+                # the next node boundary and reports each finished node as it lands.
+                # Background checkpoint writes let generate_node start on the plan
+                # as soon as plan_node returns instead of after the checkpoint commit
+                async with asyncio.timeout(600.0):
+                    async for update in graph.astream(
+                        state, config=config, stream_mode="updates", **ASYNC_CHECKPOINT_KWARGS
+                    ):
+                        for node in update:
+                            emit_event_nowait(project_id, f"{node} complete", agent="system", level="debug", sampled=True)
+                        # finalize_node is the only edge to END
+                        finished = "finalize_node" in update
+                        if stop_event.is_set():
+                            break
+                if finished:
+                    LOGGER.info("Graph stream completed for project %s", project_id)
+                    await self._set_status(project_uuid, "done")
+                elif stop_event.is_set():
+                    LOGGER.info("Workflow stopped between steps for project %s", project_id)
+                    await self._set_status(project_uuid, "stopped")
+                else:
+                    LOGGER.warning("Graph stream ended before finalize_node for project %s", project_id)
             except asyncio.TimeoutError:
                 error_msg = "Workflow timed out after 600s"
                 LOGGER.error("%s for project %s", error_msg, project_id)
                 await emit_event(project_id, error_msg, agent="system", level="error")
-                async with get_session() as session:
-                    await db_utils.update_project_status(session, UUID(project_id), "failed")
-                raise RuntimeError(error_msg)
+                await self._set_status(project_uuid, "failed")
             except Exception as invoke_error:
-                LOGGER.exception("graph.ainvoke failed for project %s: %s", project_id, invoke_error)
+                LOGGER.exception("Graph run failed for project %s: %s", project_id, invoke_error)
                 error_msg = f"Workflow execution failed: {str(invoke_error)[:200]}"
                 await emit_event(project_id, error_msg, agent="system", level="error")
-                async with get_session() as session:
-                    await db_utils.update_project_status(session, UUID(project_id), "failed")
-                raise
+                await self._set_status(project_uuid, "failed")
         except asyncio.CancelledError:
-            LOGGER.info("Workflow cancelled for project %s", project_id)
-            async with get_session() as session:
-                await db_utils.update_project_status(session, UUID(project_id), "stopped")
+            if self._closing:
+                # Cut off by shutdown: stay "running" so startup resumes it
+                LOGGER.info("Workflow interrupted by shutdown for project %s", project_id)
+            else:
+                LOGGER.info("Workflow cancelled for project %s", project_id)
+                await self._set_status(project_uuid, "stopped")
             raise
         except Exception as e:
             LOGGER.exception("Workflow failed for project %s: %s", project_id, e)
-            from backend.core.event_bus import emit_event
             await emit_event(project_id, f"Workflow error: {str(e)[:200]}", agent="system", level="error")
-            async with get_session() as session:
-                await db_utils.update_project_status(session, UUID(project_id), "failed")
+            await self._set_status(project_uuid, "failed")
 
     async def resume_project(self, project_id: UUID) -> None:
         project_str = str(project_id)
         LOGGER.info("Resuming project %s", project_str)
         
         try:
-            graph = await self._get_graph()
-            config = {"configurable": {"thread_id": project_str}}
-            
-            snapshot = await graph.aget_state(config)
-            if not snapshot.values:
-                LOGGER.warning("No checkpoint found for %s. Marking as failed.", project_str)
-                async with get_session() as session:
-                    await db_utils.update_project_status(session, project_id, "failed")
+            if await self._has_checkpoint(project_str):
+                await self._enqueue(project_str, None)
                 return
-
-            task = asyncio.create_task(self._run_workflow(project_str, state=None))
-            self._tasks[project_str] = task
-            task.add_done_callback(lambda _: self._tasks.pop(project_str, None))
+            LOGGER.warning("No checkpoint found for %s. Marking as failed.", project_str)
         except Exception as e:
             LOGGER.error("Failed to resume project %s: %s", project_id, e)
-            async with get_session() as session:
-                await db_utils.update_project_status(session, project_id, "failed")
+
+        # Both failure outcomes share one terminal write
+        await self._set_status(project_id, "failed")
+
+    async def recover_queued_project(
+        self, project_id: UUID, title: str, description: str, target: str
+    ) -> None:
+        """Recovery for a project left "queued" by a restart.
+
+        A queued resume already has a checkpoint and continues from it; a new
+        project never reached the graph, so it starts from scratch.
+        """
+        try:
+            has_checkpoint = await self._has_checkpoint(str(project_id))
+        except Exception as e:
+            LOGGER.error("Failed to check checkpoint for queued project %s: %s", project_id, e)
+            has_checkpoint = False
+        if has_checkpoint:
+            await self._enqueue(str(project_id), None)
+        else:
+            await self.async_start(project_id, title, description, target)
+
+    async def _has_checkpoint(self, project_id: str) -> bool:
+        graph = await self._get_graph()
+        snapshot = await graph.aget_state(_thread_config(project_id))
+        return bool(snapshot.values)
 
     async def shutdown(self) -> None:
+        from backend.core.checkpointer import close_checkpointer
+        self._closing = True
+        for worker in self._workers:
+            worker.cancel()
+        # Let cancelled runs unwind before their checkpointer (and then the
+        # event writers, flushed by the caller) go away
+        await asyncio.gather(*self._workers, return_exceptions=True)
         await close_checkpointer()
 
     def _group_steps(self, steps):
-        from collections import OrderedDict
-        from uuid import uuid4
-        groups = OrderedDict()
-        for step in steps:
-            group_key = step.get("parallel_group") or step.get("id") or str(uuid4())
-            groups.setdefault(group_key, []).append(step)
-        return list(groups.items())
+        from backend.core.step_utils import group_steps
+        return group_steps(steps)
 
 orchestrator = Orchestrator()
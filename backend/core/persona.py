@@ -0,0 +1,124 @@
+"""Persona prompt resolution for custom agents and teams.
+
+Builds the text block injected ahead of agent system prompts when a workflow
+was started with a ``custom_agent_id`` or ``team_id``.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.presets import get_preset_by_id
+from backend.memory.db import get_session
+from backend.memory.models import CustomAgent, Team, TeamAgentLink, TeamMember
+
+
+# Composed prompts keyed by ("agent" | "team", id). Personas change only through
+# the custom-agent/team endpoints, which call invalidate_persona_cache().
+PERSONA_CACHE_TTL_S = 300.0
+_PERSONA_CACHE_MAX = 1024
+_persona_cache: "OrderedDict[Tuple[str, str], Tuple[float, Optional[str]]]" = OrderedDict()
+
+
+def invalidate_persona_cache() -> None:
+    """Drop all cached personas (a custom agent edit also changes its teams' prompts)."""
+    _persona_cache.clear()
+
+
+def _iter_member_blocks(
+    preset_ids: Iterable[str], custom_members: Iterable[CustomAgent]
+) -> Iterator[str]:
+    # One f-string per block so team resolution doesn't build intermediate strings.
+    for pid in sorted(preset_ids):
+        preset = get_preset_by_id(pid)
+        if not preset:
+            continue
+        tags = ", ".join(preset.tags) if preset.tags else ""
+        tags_block = f"\nTags: {tags}\n" if tags else ""
+        yield f"--- PRESET: {preset.name} ({preset.id}) ---\n{preset.persona_prompt}\n{tags_block}"
+
+    for m in custom_members:
+        tech = ", ".join(m.tech_stack) if m.tech_stack else ""
+        tech_block = f"\nTech Stack: {tech}\n" if tech else ""
+        yield f"--- {m.name} ---\n{m.prompt}\n{tech_block}"
+
+
+async def _resolve_custom_agent(session: AsyncSession, custom_agent_id: UUID) -> Optional[str]:
+    res = await session.execute(select(CustomAgent).where(CustomAgent.id == custom_agent_id))
+    agent = res.scalar_one_or_none()
+    if not agent:
+        return None
+    tech = ", ".join(agent.tech_stack) if agent.tech_stack else ""
+    tech_block = f"\nTech Stack: {tech}\n" if tech else ""
+    return f"=== CUSTOM AGENT: {agent.name} ===\n{agent.prompt}\n{tech_block}"
+
+
+async def _resolve_team(session: AsyncSession, team_id: UUID) -> Optional[str]:
+    # Team row and preset members in one round trip: one row per preset member,
+    # or a single row with a NULL preset_id when the team has none.
+    res = await session.execute(
+        select(Team.name, Team.description, TeamMember.preset_id)
+        .outerjoin(
+            TeamMember,
+            and_(TeamMember.team_id == Team.id, TeamMember.preset_id.is_not(None)),
+        )
+        .where(Team.id == team_id)
+    )
+    rows = res.all()
+    if not rows:
+        return None
+    team_name, team_description = rows[0].name, rows[0].description
+    preset_ids = {row.preset_id for row in rows if row.preset_id}
+
+    # Custom agents come from team_members plus the legacy team_agent_links
+    # table (backward-compat, custom only), resolved in SQL.
+    custom_ids = select(TeamMember.custom_agent_id).where(
+        TeamMember.team_id == team_id, TeamMember.custom_agent_id.is_not(None)
+    ).union(
+        select(TeamAgentLink.agent_id).where(TeamAgentLink.team_id == team_id)
+    )
+    res_agents = await session.execute(
+        select(CustomAgent).where(CustomAgent.id.in_(custom_ids))
+    )
+    custom_members = list(res_agents.scalars().all())
+
+    members_prompt = "\n\n".join(_iter_member_blocks(preset_ids, custom_members)) or "No members.\n"
+    description_block = f"{team_description}\n\n" if team_description else ""
+    return f"=== TEAM: {team_name} ===\n{description_block}{members_prompt}"
+
+
+async def resolve_persona_prompt(
+    custom_agent_id: Optional[str | UUID], team_id: Optional[str | UUID]
+) -> Optional[str]:
+    """Return the persona prompt for a custom agent or team, if any.
+
+    Preset-only (or persona-less) runs return immediately without touching the DB;
+    resolved prompts are cached for ``PERSONA_CACHE_TTL_S``.
+    """
+    if custom_agent_id:
+        resolver, kind, target_id = _resolve_custom_agent, "agent", custom_agent_id
+    elif team_id:
+        resolver, kind, target_id = _resolve_team, "team", team_id
+    else:
+        return None
+
+    key = (kind, str(target_id))
+    cached = _persona_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < PERSONA_CACHE_TTL_S:
+        _persona_cache.move_to_end(key)
+        return cached[1]
+
+    async with get_session() as session:
+        prompt = await resolver(session, UUID(key[1]))
+
+    _persona_cache[key] = (time.monotonic(), prompt)
+    _persona_cache.move_to_end(key)
+    if len(_persona_cache) > _PERSONA_CACHE_MAX:
+        _persona_cache.popitem(last=False)
+    return prompt
@@ -6,7 +6,7 @@ Each preset includes metadata for UI display and prompt injection.
 
 from __future__ import annotations
 
-from typing import List, Literal
+from typing import Dict, List, Literal, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -14,7 +14,12 @@ Category = Literal["development", "writing", "management"]
 
 
 class AgentPreset(BaseModel):
-    """Represents an agent persona with associated metadata."""
+    """Represents an agent persona with associated metadata.
+
+    Instances are shared module-level constants, hence frozen.
+    """
+
+    model_config = {"frozen": True}
 
     id: str = Field(..., description="Unique identifier (e.g. 'senior_python')")
     name: str = Field(..., description="Display name")
@@ -31,9 +36,10 @@ class AgentPreset(BaseModel):
 # Default Presets (Marketplace v1)
 # ---------------------------------------------------------------------------
 
+# Static literals: model_construct skips validation (defaults still apply)
 PRESETS: List[AgentPreset] = [
     # Development
-    AgentPreset(
+    AgentPreset.model_construct(
         id="senior_python",
         name="Senior Python Developer",
         description="Expert in Python, FastAPI, Django, async programming, and best practices.",
@@ -48,7 +54,7 @@ PRESETS: List[AgentPreset] = [
         tags=["python", "fastapi", "django", "backend", "api"],
         popular=True,
     ),
-    AgentPreset(
+    AgentPreset.model_construct(
         id="senior_cpp",
         name="Senior C++ Developer",
         description="Expert in modern C++ (C++17/20), system programming, and performance.",
@@ -63,7 +69,7 @@ PRESETS: List[AgentPreset] = [
         tags=["cpp", "c++", "systems", "performance", "embedded"],
         popular=True,
     ),
-    AgentPreset(
+    AgentPreset.model_construct(
         id="fullstack_ts",
         name="Fullstack TypeScript Dev",
         description="Expert in React, Next.js, Node.js, and modern TypeScript.",
@@ -78,7 +84,7 @@ PRESETS: List[AgentPreset] = [
         tags=["typescript", "react", "nextjs", "nodejs", "fullstack"],
         popular=True,
     ),
-    AgentPreset(
+    AgentPreset.model_construct(
         id="devops_engineer",
         name="DevOps Engineer",
         description="Expert in Docker, Kubernetes, CI/CD, and cloud infrastructure.",
@@ -94,7 +100,7 @@ PRESETS: List[AgentPreset] = [
         popular=False,
     ),
     # Writing
-    AgentPreset(
+    AgentPreset.model_construct(
         id="latex_writer",
         name="LaTeX Writer",
         description="Academic and technical document specialist using LaTeX.",
@@ -110,7 +116,7 @@ PRESETS: List[AgentPreset] = [
         popular=True,
         requires_document_mode=True,  # LaTeX Writer works with Documents, not Projects
     ),
-    AgentPreset(
+    AgentPreset.model_construct(
         id="technical_writer",
         name="Technical Writer",
         description="Creates clear documentation, READMEs, and API guides.",
@@ -125,7 +131,7 @@ PRESETS: List[AgentPreset] = [
         tags=["documentation", "readme", "api", "markdown", "guides"],
         popular=False,
     ),
-    AgentPreset(
+    AgentPreset.model_construct(
         id="gost_writer",
         name="ГОСТ-Документатор",
         description="Специалист по созданию документов по российским ГОСТ-стандартам (ГОСТ 19.101-77 и др.).",
@@ -142,7 +148,7 @@ PRESETS: List[AgentPreset] = [
         requires_document_mode=True,
     ),
     # Management
-    AgentPreset(
+    AgentPreset.model_construct(
         id="product_manager",
         name="Product Manager",
         description="Focuses on user stories, requirements, and product vision.",
@@ -157,7 +163,7 @@ PRESETS: List[AgentPreset] = [
         tags=["product", "requirements", "user-stories", "roadmap"],
         popular=True,
     ),
-    AgentPreset(
+    AgentPreset.model_construct(
         id="tech_lead",
         name="Tech Lead",
         description="Balances architecture, code quality, and team productivity.",
@@ -175,19 +181,25 @@ PRESETS: List[AgentPreset] = [
 ]
 
 
+# Indexes built once at import: PRESETS is static at runtime
+_BY_ID: Dict[str, AgentPreset] = {p.id: p for p in PRESETS}
+_POPULAR: Tuple[AgentPreset, ...] = tuple(p for p in PRESETS if p.popular)
+_BY_CATEGORY: Dict[str, Tuple[AgentPreset, ...]] = {}
+for _preset in PRESETS:
+    _BY_CATEGORY[_preset.category] = _BY_CATEGORY.get(_preset.category, ()) + (_preset,)
+del _preset
+
+
 def get_preset_by_id(preset_id: str) -> AgentPreset | None:
     """Lookup a preset by its ID."""
-    for preset in PRESETS:
-        if preset.id == preset_id:
-            return preset
-    return None
+    return _BY_ID.get(preset_id)
 
 
-def get_popular_presets() -> List[AgentPreset]:
+def get_popular_presets() -> Tuple[AgentPreset, ...]:
     """Return presets marked as popular for homepage display."""
-    return [p for p in PRESETS if p.popular]
+    return _POPULAR
 
 
-def get_presets_by_category(category: Category) -> List[AgentPreset]:
+def get_presets_by_category(category: Category) -> Tuple[AgentPreset, ...]:
     """Filter presets by category."""
-    return [p for p in PRESETS if p.category == category]
+    return _BY_CATEGORY.get(category, ())
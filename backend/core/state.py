@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import TypedDict, List, Dict, Any, Optional
 
 class ProjectState(TypedDict):
@@ -20,3 +21,39 @@ class ProjectState(TypedDict):
     retry_count: int
     status: str  # planning, generating, testing, correcting, done, failed
 
+
+@dataclass(slots=True, frozen=True)
+class AgentContext:
+    """Read-only view of the state fields the agents read.
+
+    Everything else in ProjectState is graph bookkeeping.
+    """
+
+    project_id: str
+    title: str
+    description: str
+    target: str = ""
+    tech_stack: Optional[str] = None
+    agent_preset: Optional[str] = None
+    custom_agent_id: Optional[str] = None
+    team_id: Optional[str] = None
+    persona_prompt: Optional[str] = None
+    research_results: Optional[Dict[str, Any]] = None
+    research_queries: Optional[List[str]] = None
+
+
+def build_context(state: ProjectState) -> AgentContext:
+    """Agent context for a node, built once from the current state."""
+    return AgentContext(
+        project_id=state["project_id"],
+        title=state["title"],
+        description=state["description"],
+        target=state["target"],
+        tech_stack=state.get("tech_stack"),
+        agent_preset=state.get("agent_preset"),
+        custom_agent_id=state.get("custom_agent_id"),
+        team_id=state.get("team_id"),
+        persona_prompt=state.get("persona_prompt"),
+        research_results=state.get("research_results"),
+        research_queries=state.get("research_queries"),
+    )
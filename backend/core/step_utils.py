@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-from collections import OrderedDict
-from typing import Any, Dict, Iterable, List, Tuple
-from uuid import uuid4
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
 
-def group_steps(steps: Iterable[Dict[str, Any]]) -> List[Tuple[str, List[Dict[str, Any]]]]:
-    groups: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+def group_steps(steps: Iterable[Dict[str, Any]]) -> List[Tuple[Hashable, List[Dict[str, Any]]]]:
+    # dicts keep insertion order; a step with neither group nor id is its own
+    # group, keyed by object identity instead of a throwaway uuid4
+    groups: Dict[Hashable, List[Dict[str, Any]]] = {}
     for step in steps:
-        group_key = step.get("parallel_group") or step.get("id") or str(uuid4())
+        group_key = step.get("parallel_group") or step.get("id") or id(step)
         groups.setdefault(group_key, []).append(step)
     return list(groups.items())
-
@@ -0,0 +1,138 @@
+"""Cross-worker registry of running document workflows.
+
+Each worker keeps its own ``asyncio.Task`` handles, but ownership is recorded in
+the shared database so a stop request that lands on another worker still
+reaches the task: the owning worker polls for ``stop_requested`` rows and
+cancels locally.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+from typing import Coroutine, Optional, Set
+from uuid import UUID
+
+from backend.memory.db import get_session
+from backend.memory import utils as db_utils
+from backend.utils.logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+STOP_POLL_INTERVAL = 1.0
+
+
+class DocumentTaskRegistry:
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._watcher: Optional[asyncio.Task[None]] = None
+        # Strong references: the loop only keeps weak ones to running tasks
+        self._cleanup: Set[asyncio.Task[None]] = set()
+
+    async def register(self, document_id: str, coro: Coroutine[None, None, None]) -> asyncio.Task[None]:
+        """Record ownership of ``document_id`` and spawn its workflow task."""
+        try:
+            async with get_session() as session:
+                await db_utils.upsert_document_task(
+                    session, UUID(document_id), worker_id=WORKER_ID, pid=os.getpid()
+                )
+        except Exception:
+            # Local cancellation still works; only cross-worker stop is lost.
+            LOGGER.exception("Failed to register document task %s", document_id)
+
+        task = asyncio.create_task(coro)
+        self._tasks[document_id] = task
+        task.add_done_callback(lambda done: self._on_done(document_id, done))
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch_stop_requests())
+        return task
+
+    def _on_done(self, document_id: str, task: asyncio.Task[None]) -> None:
+        # A resume may have registered a newer run for the same document; only
+        # the registered run releases the entry and its row
+        if self._tasks.get(document_id) is not task:
+            return
+        cleanup = asyncio.create_task(self.mark_done(document_id))
+        self._cleanup.add(cleanup)
+        cleanup.add_done_callback(self._cleanup.discard)
+
+    async def mark_done(self, document_id: str) -> None:
+        self._tasks.pop(document_id, None)
+        try:
+            async with get_session() as session:
+                await db_utils.delete_document_task(session, UUID(document_id), worker_id=WORKER_ID)
+        except Exception:
+            LOGGER.exception("Failed to release document task %s", document_id)
+
+    async def release_dead_workers(self) -> None:
+        """Drop rows owned by workers on this host whose process has exited.
+
+        Such rows are left behind when a worker dies without running its done
+        callbacks; owners on other hosts cannot be checked from here. Call at
+        startup, before this worker registers anything: rows already under our
+        own WORKER_ID (a restarted container reusing the pid) are stale too.
+        """
+        host = WORKER_ID.rsplit(":", 1)[0]
+        try:
+            async with get_session() as session:
+                owners = await db_utils.list_document_task_owners(session)
+                dead = [
+                    worker_id
+                    for worker_id, pid in owners
+                    if worker_id == WORKER_ID
+                    or (worker_id.rsplit(":", 1)[0] == host and not _pid_alive(pid))
+                ]
+                released = await db_utils.delete_document_tasks_of_workers(session, dead)
+        except Exception:
+            LOGGER.exception("Failed to release document tasks of dead workers")
+            return
+        if released:
+            LOGGER.warning("Released %d document tasks left by dead workers", released)
+
+    async def request_stop(self, document_id: str) -> None:
+        if self._cancel_local(document_id):
+            return
+        try:
+            async with get_session() as session:
+                found = await db_utils.request_document_task_stop(session, UUID(document_id))
+        except Exception:
+            LOGGER.exception("Failed to request stop for document %s", document_id)
+            return
+        if not found:
+            LOGGER.info("No running task registered for document %s", document_id)
+
+    def _cancel_local(self, document_id: str) -> bool:
+        task = self._tasks.get(document_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def _watch_stop_requests(self) -> None:
+        while self._tasks:
+            await asyncio.sleep(STOP_POLL_INTERVAL)
+            try:
+                async with get_session() as session:
+                    doc_ids = await db_utils.list_stop_requested_document_tasks(session, WORKER_ID)
+            except Exception:
+                LOGGER.debug("Failed to poll document stop requests", exc_info=True)
+                continue
+            for doc_id in doc_ids:
+                if self._cancel_local(str(doc_id)):
+                    LOGGER.info("Cancelled document %s on remote stop request", doc_id)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by another user
+        pass
+    return True
+
+
+document_task_registry = DocumentTaskRegistry()
@@ -1,41 +1,93 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import Any, Dict, Mapping, Set, List, Optional
+from typing import Any, Dict, Mapping, Tuple, List, Optional, Union
 
+import orjson
 from fastapi import WebSocket
 
+from backend.utils.logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+# Per-project outbound buffer; when a slow client lets it fill, the oldest
+# message is dropped rather than blocking producers or growing without bound
+WS_QUEUE_MAX = 256
+
 class WSManager:
 
     def __init__(self) -> None:
-        self._connections: Dict[str, Set[WebSocket]] = {}
+        # Copy-on-write: connect/disconnect swap in a new tuple, so the writer
+        # reads a consistent snapshot without taking the lock
+        self._connections: Dict[str, Tuple[WebSocket, ...]] = {}
         self._lock = asyncio.Lock()
+        # One queue and one writer task per project with viewers; producers only
+        # enqueue, the writer does all socket I/O in order
+        self._queues: Dict[str, asyncio.Queue[str]] = {}
+        self._writers: Dict[str, asyncio.Task[None]] = {}
 
     async def connect(self, project_id: str, websocket: WebSocket) -> None:
         await websocket.accept()
         async with self._lock:
-            self._connections.setdefault(project_id, set()).add(websocket)
+            self._connections[project_id] = self._connections.get(project_id, ()) + (websocket,)
+            if project_id not in self._writers:
+                queue: asyncio.Queue[str] = asyncio.Queue(WS_QUEUE_MAX)
+                self._queues[project_id] = queue
+                self._writers[project_id] = asyncio.create_task(self._write(project_id, queue))
 
     async def disconnect(self, project_id: str, websocket: WebSocket) -> None:
+        await self._remove(project_id, (websocket,))
+
+    async def _remove(self, project_id: str, websockets: Tuple[WebSocket, ...]) -> None:
         async with self._lock:
             conns = self._connections.get(project_id)
             if not conns:
                 return
-            conns.discard(websocket)
-            if not conns:
-                self._connections.pop(project_id, None)
+            remaining = tuple(c for c in conns if all(c is not w for w in websockets))
+            if remaining:
+                self._connections[project_id] = remaining
+                return
+            self._connections.pop(project_id, None)
+            self._queues.pop(project_id, None)
+            writer = self._writers.pop(project_id, None)
+            if writer is not None and writer is not asyncio.current_task():
+                writer.cancel()
 
-    async def broadcast(self, project_id: str, payload: Mapping[str, Any]) -> None:
-        async with self._lock:
-            connections = list(self._connections.get(project_id, set()))
+    def has_connections(self, project_id: str) -> bool:
+        return bool(self._connections.get(project_id))
 
-        if not connections:
+    def publish(self, project_id: str, payload: Union[Mapping[str, Any], bytes]) -> None:
+        """Queue a message for the project's viewers without waiting on delivery."""
+        queue = self._queues.get(project_id)
+        if queue is None:
             # No connections - skip silently (project might not have active viewers)
             return
 
-        message = json.dumps(payload, default=str)
+        # Pre-encoded JSON is sent as text; the frontend parses string frames
+        if isinstance(payload, bytes):
+            message = payload.decode("utf-8")
+        else:
+            message = orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    async def broadcast(self, project_id: str, payload: Union[Mapping[str, Any], bytes]) -> None:
+        self.publish(project_id, payload)
 
+    async def _write(self, project_id: str, queue: asyncio.Queue[str]) -> None:
+        while True:
+            message = await queue.get()
+            connections = self._connections.get(project_id)
+            if not connections:
+                continue
+            await self._send_all(project_id, connections, message)
+            if self._writers.get(project_id) is not asyncio.current_task():
+                # Last viewer left while sending
+                return
+
+    async def _send_all(self, project_id: str, connections: Tuple[WebSocket, ...], message: str) -> None:
         async def _send(connection: WebSocket) -> WebSocket | None:
             try:
                 # Avoid one slow client stalling broadcasts
@@ -43,23 +95,24 @@ class WSManager:
                 return None
             except Exception as e:
                 # Log but don't fail the whole broadcast
-                from backend.utils.logging import get_logger
-                logger = get_logger(__name__)
-                logger.debug("Failed to send WS message to client: %s", e)
+                LOGGER.debug("Failed to send WS message to client: %s", e)
                 return connection
 
         dead_connections: List[WebSocket] = []
-        if connections:
-            results = await asyncio.gather(*(_send(c) for c in connections), return_exceptions=True)
-            dead_connections = [c for c in results if c is not None and not isinstance(c, Exception)]
-        
+        if len(connections) == 1:
+            # Usual case (one viewer): send inline, no tasks to schedule
+            dead = await _send(connections[0])
+            if dead is not None:
+                dead_connections.append(dead)
+        else:
+            # _send never raises, so the group never cancels siblings
+            async with asyncio.TaskGroup() as tg:
+                sends = [tg.create_task(_send(c)) for c in connections]
+            dead_connections = [dead for t in sends if (dead := t.result()) is not None]
+
         # Clean up dead connections
         if dead_connections:
-            async with self._lock:
-                conns = self._connections.get(project_id)
-                if conns:
-                    for conn in dead_connections:
-                        conns.discard(conn)
+            await self._remove(project_id, tuple(dead_connections))
 
 _ws_manager: Optional[WSManager] = None
 
@@ -1,45 +1,63 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Dict, Optional
 
-from backend.settings import get_settings
+from backend.settings import Settings, get_settings
 
 class BaseLLMAdapter(ABC):
     @abstractmethod
     async def acomplete(self, prompt: str, json_mode: bool = False, cache_key: Optional[str] = None) -> str:
         pass
 
-_cached_adapter: Optional[BaseLLMAdapter] = None
+    async def aclose(self) -> None:
+        """Release network resources held by the adapter (no-op by default)."""
 
-def get_llm_adapter() -> BaseLLMAdapter:
-    global _cached_adapter
-    if _cached_adapter:
-        return _cached_adapter
+def _mock(settings: Settings) -> BaseLLMAdapter:
+    from .mock_adapter import MockLLMAdapter
+    return MockLLMAdapter()
+
+def _groq(settings: Settings) -> BaseLLMAdapter:
+    from .groq_adapter import GroqLLMAdapter
+    return GroqLLMAdapter(model=settings.groq_model)
+
+def _github(settings: Settings) -> BaseLLMAdapter:
+    from .github_adapter import GitHubModelsAdapter
+    return GitHubModelsAdapter(model=settings.github_model)
+
+def _deepseek(settings: Settings) -> BaseLLMAdapter:
+    from .deepseek_adapter import DeepSeekAdapter
+    return DeepSeekAdapter(model=settings.deepseek_model)
+
+def _cerebras(settings: Settings) -> BaseLLMAdapter:
+    from .cerebras_adapter import CerebrasAdapter
+    return CerebrasAdapter(model=settings.cerebras_model)
 
+def _ollama(settings: Settings) -> BaseLLMAdapter:
+    from .ollama_adapter import OllamaLLMAdapter
+    return OllamaLLMAdapter(model=settings.ollama_model, host=settings.ollama_host)
+
+# llm_mode -> factory; provider modules are imported only for the selected mode
+_ADAPTER_FACTORIES: Dict[str, Callable[[Settings], BaseLLMAdapter]] = {
+    "mock": _mock,
+    "groq": _groq,
+    "github": _github,
+    "deepseek": _deepseek,
+    "cerebras": _cerebras,
+    "ollama": _ollama,
+}
+
+# One adapter (and HTTP client) per process; get_llm_adapter.cache_clear() resets it
+@lru_cache(maxsize=1)
+def get_llm_adapter() -> BaseLLMAdapter:
     settings = get_settings()
-    if settings.llm_mode == "mock":
-        from .mock_adapter import MockLLMAdapter
-        _cached_adapter = MockLLMAdapter()
-    
-    elif settings.llm_mode == "groq":
-        from .groq_adapter import GroqLLMAdapter
-        _cached_adapter = GroqLLMAdapter(model=settings.groq_model)
-    
-    elif settings.llm_mode == "github":
-        from .github_adapter import GitHubModelsAdapter
-        _cached_adapter = GitHubModelsAdapter(model=settings.github_model)
-    
-    elif settings.llm_mode == "deepseek":
-        from .deepseek_adapter import DeepSeekAdapter
-        _cached_adapter = DeepSeekAdapter(model=settings.deepseek_model)
-    
-    elif settings.llm_mode == "cerebras":
-        from .cerebras_adapter import CerebrasAdapter
-        _cached_adapter = CerebrasAdapter(model=settings.cerebras_model)
-    
-    else:  # ollama
-        from .ollama_adapter import OllamaLLMAdapter
-        _cached_adapter = OllamaLLMAdapter(model=settings.ollama_model)
-    
-    return _cached_adapter
+    # Unknown modes fall back to ollama, as before
+    return _ADAPTER_FACTORIES.get(settings.llm_mode, _ollama)(settings)
+
+
+async def close_llm_adapter() -> None:
+    """Close the process adapter if one was created; called on shutdown."""
+    if get_llm_adapter.cache_info().currsize:
+        await get_llm_adapter().aclose()
+        get_llm_adapter.cache_clear()
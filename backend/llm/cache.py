@@ -1,22 +1,131 @@
 from __future__ import annotations
 
-import hashlib
-from typing import Dict, Optional
+import asyncio
+import re
+import struct
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional, Tuple, Union
+
+import xxhash
+
+from backend.settings import get_settings
 from backend.utils.logging import get_logger
 
+try:
+    import lmdb  # type: ignore[import-not-found]
+except ImportError:  # optional: without it the cache is in-process only
+    lmdb = None
+
 LOGGER = get_logger(__name__)
 
-# Simple in-memory cache (could be replaced with Redis for production)
-_cache: Dict[str, str] = {}
-_MAX_CACHE_SIZE = 100
+# Prompt keys are 64-bit ints; explicit keys passed by callers stay strings
+CacheKey = Union[int, str]
+
+# Simple in-memory LRU cache (could be replaced with Redis for production):
+# hits move to the end, eviction pops the front. Size: settings.llm_cache_size
+_cache: "OrderedDict[CacheKey, str]" = OrderedDict()
+
+# Backing store behind _cache: a memory-mapped LMDB file under data_root, so
+# worker processes share hits and they survive restarts. Each provider/model
+# pair gets its own environment (a restart with another llm_mode or model never
+# sees the old answers) and entries expire after llm_cache_lmdb_ttl_s.
+LMDB_MAP_SIZE = 1 << 30
+# Stored values are a big-endian float64 write time followed by the UTF-8 response
+_STAMP = struct.Struct(">d")
+
+def _store_namespace() -> str:
+    settings = get_settings()
+    model = getattr(settings, f"{settings.llm_mode}_model", "default")
+    return re.sub(r"[^A-Za-z0-9._-]", "_", f"{settings.llm_mode}-{model}")
+
+@lru_cache(maxsize=1)
+def _lmdb_env() -> Optional[Any]:
+    settings = get_settings()
+    if lmdb is None or not settings.llm_cache_lmdb:
+        return None
+    path = settings.data_root / "llm_cache" / _store_namespace()
+    path.mkdir(parents=True, exist_ok=True)
+    try:
+        return lmdb.open(str(path), map_size=LMDB_MAP_SIZE, max_readers=128, writemap=True)
+    except lmdb.Error as exc:
+        LOGGER.warning("LLM cache store unavailable, using memory only: %s", exc)
+        return None
+
+def _store_key(key: CacheKey) -> bytes:
+    # Distinct prefixes keep the 8-byte hash keys apart from explicit string keys
+    if isinstance(key, int):
+        return b"h" + key.to_bytes(8, "big")
+    return b"k" + key.encode("utf-8")
+
+def _store_get(key: CacheKey) -> Optional[str]:
+    env = _lmdb_env()
+    if env is None:
+        return None
+    with env.begin(write=False) as txn:
+        value = txn.get(_store_key(key))
+    if value is None or len(value) < _STAMP.size:
+        return None
+    (written_at,) = _STAMP.unpack_from(value)
+    if time.time() - written_at > get_settings().llm_cache_lmdb_ttl_s:
+        # Expired; the next put for this key overwrites it
+        return None
+    return value[_STAMP.size:].decode("utf-8")
+
+def _store_put(key: CacheKey, response: str) -> None:
+    env = _lmdb_env()
+    if env is None:
+        return
+    try:
+        with env.begin(write=True) as txn:
+            txn.put(_store_key(key), _STAMP.pack(time.time()) + response.encode("utf-8"))
+    except lmdb.Error as exc:
+        # e.g. MapFullError; the in-memory entry is still there
+        LOGGER.warning("LLM cache store write failed: %s", exc)
+
+# Store writes are handed to a single background task so set_cached never does
+# file I/O on the event loop. Best effort: writes still queued at exit are lost
+# (the in-memory tier already has them for this process).
+_write_queue: "Optional[asyncio.Queue[Tuple[CacheKey, str]]]" = None
+_writer_task: "Optional[asyncio.Task[None]]" = None
+
+async def _store_writer(queue: "asyncio.Queue[Tuple[CacheKey, str]]") -> None:
+    while True:
+        key, response = await queue.get()
+        await asyncio.to_thread(_store_put, key, response)
 
-def _make_key(prompt: str, json_mode: bool) -> str:
-    content = f"{prompt}|json={json_mode}"
-    return hashlib.sha256(content.encode()).hexdigest()[:16]
+def _queue_store_put(key: CacheKey, response: str) -> None:
+    global _write_queue, _writer_task
+    if _lmdb_env() is None:
+        return
+    if _writer_task is None or _writer_task.done():
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No running loop (sync caller): write through
+            _store_put(key, response)
+            return
+        _write_queue = asyncio.Queue()
+        _writer_task = loop.create_task(_store_writer(_write_queue), name="llm-cache-writer")
+    _write_queue.put_nowait((key, response))
+
+def _make_key(prompt: str, json_mode: bool) -> int:
+    # Non-cryptographic: only has to separate the entries of the cache.
+    # json_mode is folded in as the seed rather than appended to the prompt.
+    return xxhash.xxh3_64_intdigest(prompt, seed=int(json_mode))
+
+def response_cache_key(prompt: str, json_mode: bool = False, cache_key: Optional[str] = None) -> CacheKey:
+    """Key for a request: the caller's explicit key, else the prompt hash.
+
+    Adapters compute it once per call and pass it to the *_by_key functions,
+    so a prompt is hashed once rather than on every lookup and store.
+    """
+    return cache_key or _make_key(prompt, json_mode)
 
 def get_cached(prompt: str, json_mode: bool = False) -> Optional[str]:
     key = _make_key(prompt, json_mode)
-    result = _cache.get(key)
+    result = _get_raw(key)
     if result:
         LOGGER.info("Cache HIT for key %s", key)
     return result
@@ -25,24 +134,65 @@ def set_cached(prompt: str, response: str, json_mode: bool = False) -> None:
     key = _make_key(prompt, json_mode)
     _set_raw(key, response)
 
-def get_cached_by_key(key: str) -> Optional[str]:
-    result = _cache.get(key)
+def get_cached_by_key(key: CacheKey) -> Optional[str]:
+    result = _get_raw(key)
     if result:
         LOGGER.info("Cache HIT for explicit key %s", key)
     return result
 
-def set_cached_by_key(key: str, response: str) -> None:
+def set_cached_by_key(key: CacheKey, response: str) -> None:
     _set_raw(key, response)
 
-def _set_raw(key: str, response: str) -> None:
-    # Evict oldest if cache is full (simple FIFO)
-    if len(_cache) >= _MAX_CACHE_SIZE:
-        oldest_key = next(iter(_cache))
-        del _cache[oldest_key]
-    
+def _get_raw(key: CacheKey) -> Optional[str]:
+    result = _cache.get(key)
+    if result is not None:
+        _cache.move_to_end(key)
+        return result
+    result = _store_get(key)
+    if result is not None:
+        _remember(key, result)
+    return result
+
+def _remember(key: CacheKey, response: str) -> None:
+    if key in _cache:
+        _cache.move_to_end(key)
+    elif len(_cache) >= get_settings().llm_cache_size:
+        # Evict the least recently used entry
+        _cache.popitem(last=False)
     _cache[key] = response
-    LOGGER.info("Cache SET for key %s", key)
+
+def _set_raw(key: CacheKey, response: str) -> None:
+    _remember(key, response)
+    _queue_store_put(key, response)
+    LOGGER.debug("Cache SET for key %s", key)
+
+# Negative cache: prompts whose last attempt failed with a non-transient error
+# (bad request, truncation, auth). Identical calls within the TTL fail at once
+# instead of spending a semaphore slot on the same failure.
+NEGATIVE_TTL_S = 60.0
+_failures: "OrderedDict[CacheKey, Tuple[float, str]]" = OrderedDict()
+
+def check_recent_failure(key: CacheKey) -> None:
+    """Raise RuntimeError if the request under ``key`` failed less than NEGATIVE_TTL_S ago."""
+    entry = _failures.get(key)
+    if entry is None:
+        return
+    failed_at, message = entry
+    if time.monotonic() - failed_at < NEGATIVE_TTL_S:
+        raise RuntimeError(f"recent-failure: {message}")
+    del _failures[key]
+
+def record_failure(key: CacheKey, exc: BaseException) -> None:
+    _failures.pop(key, None)
+    if len(_failures) >= get_settings().llm_cache_size:
+        _failures.popitem(last=False)
+    _failures[key] = (time.monotonic(), repr(exc))
 
 def clear_cache() -> None:
     _cache.clear()
+    _failures.clear()
+    env = _lmdb_env()
+    if env is not None:
+        with env.begin(write=True) as txn:
+            txn.drop(env.open_db(txn=txn), delete=False)
     LOGGER.info("Cache cleared")
@@ -2,24 +2,31 @@ from __future__ import annotations
 
 import os
 from typing import Optional
-import logging
-
-from openai import AsyncOpenAI
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-    before_sleep_log,
-)
 
 from backend.utils.logging import get_logger
-from backend.llm.cache import get_cached, set_cached, get_cached_by_key, set_cached_by_key
 
 from .adapter import BaseLLMAdapter
+from .concurrency import get_llm_rate_limiter
+from .openai_client import (
+    build_openai_client,
+    cached_complete,
+    collect_stream,
+    retry_transient,
+    stream_kwargs,
+    system_turns,
+)
 
 LOGGER = get_logger(__name__)
 
+SYSTEM_PROMPT_TEXT = "You are an expert software engineer focused on writing clean, maintainable code."
+SYSTEM_PROMPT_JSON = SYSTEM_PROMPT_TEXT + (
+    " You MUST respond with ONLY valid JSON. "
+    "Do NOT include any text, explanations, or markdown before or after the JSON object. "
+    "Your entire response must be parseable by JSON.parse(). "
+    "Start with { and end with }."
+)
+_SYSTEM_MESSAGE_TEXT, _SYSTEM_MESSAGE_JSON = system_turns(SYSTEM_PROMPT_TEXT, SYSTEM_PROMPT_JSON)
+
 class CerebrasAdapter(BaseLLMAdapter):
 
     def __init__(self, model: str = "llama-3.3-70b"):
@@ -28,77 +35,38 @@ class CerebrasAdapter(BaseLLMAdapter):
             LOGGER.warning("CEREBRAS_API_KEY not found. Cerebras adapter will fail.")
         
         # Cerebras uses OpenAI-compatible API
-        self.client = AsyncOpenAI(
-            base_url="https://api.cerebras.ai/v1",
-            api_key=api_key,
-        )
+        self.client = build_openai_client("https://api.cerebras.ai/v1", api_key)
         self.model = model
+        self._base_kwargs = stream_kwargs(model, temperature=0.2, max_tokens=8000)
         LOGGER.info("Initialized Cerebras adapter with model: %s (fastest inference)", model)
 
-    @retry(
-        retry=retry_if_exception_type(Exception),
-        wait=wait_exponential(multiplier=1, min=2, max=20),
-        stop=stop_after_attempt(3),
-        before_sleep=before_sleep_log(LOGGER, logging.INFO),
-    )
+    async def aclose(self) -> None:
+        await self.client.close()
+
+    @retry_transient(LOGGER)
     async def acomplete(self, prompt: str, json_mode: bool = False, cache_key: Optional[str] = None) -> str:
-        # Check cache first
-        cached = None
-        if cache_key:
-            cached = get_cached_by_key(cache_key)
-        else:
-            cached = get_cached(prompt, json_mode)
-            
-        if cached:
-            LOGGER.info("Returning cached response")
-            return cached
-        
-        try:
-            result = await self._invoke(prompt, json_mode=json_mode)
-            if cache_key:
-                set_cached_by_key(cache_key, result)
-            else:
-                set_cached(prompt, result, json_mode)
-            return result
-        except Exception as exc:
-            LOGGER.error("Cerebras request failed: %s", exc)
-            raise
+        return await cached_complete(
+            self._invoke, prompt, json_mode, cache_key, provider="Cerebras", logger=LOGGER
+        )
 
     async def _invoke(self, prompt: str, json_mode: bool) -> str:
+        await get_llm_rate_limiter().acquire()
         LOGGER.info("Calling Cerebras (FASTEST) with model '%s' (json_mode=%s)", self.model, json_mode)
         
-        system_prompt = "You are an expert software engineer focused on writing clean, maintainable code."
-        if json_mode:
-            system_prompt += (
-                " You MUST respond with ONLY valid JSON. "
-                "Do NOT include any text, explanations, or markdown before or after the JSON object. "
-                "Your entire response must be parseable by JSON.parse(). "
-                "Start with { and end with }."
-            )
-
         messages = [
-            {"role": "system", "content": system_prompt},
+            _SYSTEM_MESSAGE_JSON if json_mode else _SYSTEM_MESSAGE_TEXT,
             {"role": "user", "content": prompt},
         ]
 
-        kwargs = {
-            "model": self.model,
-            "messages": messages,
-            "temperature": 0.2,
-            "max_tokens": 8000,
-        }
+        kwargs = {**self._base_kwargs, "messages": messages}
 
         # Cerebras doesn't support response_format yet, so we rely on prompt engineering for JSON
 
-        response = await self.client.chat.completions.create(**kwargs)
-        
-        choice = response.choices[0]
-        finish_reason = getattr(choice, "finish_reason", None)
+        content, finish_reason = await collect_stream(await self.client.chat.completions.create(**kwargs))
         if finish_reason == "length":
             LOGGER.error("Cerebras response truncated due to token limit")
             raise RuntimeError("Response truncated (finish_reason=length)")
 
-        content = choice.message.content
-        LOGGER.info("Cerebras response received in RECORD TIME (length=%d)", len(content or ""))
-        return content or ""
+        LOGGER.info("Cerebras response received in RECORD TIME (length=%d)", len(content))
+        return content
 
@@ -1,17 +1,49 @@
 import asyncio
-from typing import Optional
+import time
+from functools import lru_cache
 from backend.settings import get_settings
 
-_semaphore: Optional[asyncio.Semaphore] = None
-
+@lru_cache(maxsize=1)
 def get_llm_semaphore() -> asyncio.Semaphore:
     """
     Get the global semaphore for LLM requests.
     This ensures we don't exceed the configured rate limit across the entire application.
     """
-    global _semaphore
-    if _semaphore is None:
-        settings = get_settings()
-        _semaphore = asyncio.Semaphore(settings.llm_semaphore)
-    return _semaphore
+    return asyncio.Semaphore(get_settings().llm_semaphore)
+
+
+
+class AsyncTokenBucket:
+    """
+    Spaces requests out to ``rate`` per second, allowing bursts of ``capacity``.
+    The semaphore caps how many requests are in flight; this caps how fast they
+    start, which is what provider rate limits (429s) actually measure.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        # Waiters are served in arrival order
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
 
+@lru_cache(maxsize=1)
+def get_llm_rate_limiter() -> AsyncTokenBucket:
+    """Process-wide limiter for outgoing provider requests (cache hits are free)."""
+    settings = get_settings()
+    return AsyncTokenBucket(
+        rate=settings.llm_rate_per_sec or float(settings.llm_semaphore),
+        capacity=float(settings.llm_semaphore),
+    )
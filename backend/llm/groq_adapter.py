@@ -15,12 +15,34 @@ from tenacity import (
 )
 
 from backend.utils.logging import get_logger
-from backend.llm.cache import get_cached, set_cached, get_cached_by_key, set_cached_by_key
+from backend.llm.cache import (
+    check_recent_failure,
+    get_cached_by_key,
+    record_failure,
+    response_cache_key,
+    set_cached_by_key,
+)
 
 from .adapter import BaseLLMAdapter
+from .concurrency import get_llm_rate_limiter
+from .openai_client import JSON_RESPONSE_FORMAT, system_turns
 
 LOGGER = get_logger(__name__)
 
+SYSTEM_PROMPT_TEXT = "You are a helpful assistant that generates code."
+SYSTEM_PROMPT_JSON = SYSTEM_PROMPT_TEXT + (
+    " You MUST respond with ONLY valid JSON. "
+    "Do NOT include any text, explanations, or markdown before or after the JSON object. "
+    "Your entire response must be parseable by JSON.parse(). "
+    "Start with { and end with }. "
+    "The 'content' field for files MUST be a plain string (not object/array). "
+    "Properly escape all newlines as \\n and quotes as \\\"."
+)
+_SYSTEM_MESSAGE_TEXT, _SYSTEM_MESSAGE_JSON = system_turns(SYSTEM_PROMPT_TEXT, SYSTEM_PROMPT_JSON)
+
+# Groq SDK counterpart of openai_client.TRANSIENT_ERRORS
+_TRANSIENT_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
 # In-memory dedupe for concurrent identical requests to avoid duplicate LLM calls
 _pending_requests: dict = {}
 
@@ -36,29 +58,35 @@ class GroqLLMAdapter(BaseLLMAdapter):
             raise RuntimeError("Groq API key is required. Set the GROQ_API_KEY environment variable or define groq_api_key in the project's .env file.")
         self.client = AsyncGroq(api_key=api_key)
         self.model = model
+        self._base_kwargs = {
+            "model": model,
+            "temperature": 0.15,  # Lower for 70B (already very creative)
+            "max_tokens": 32000,  # Max for llama-3.3-70b (supports 32K)
+        }
         
 
+    async def aclose(self) -> None:
+        await self.client.close()
+
     @retry(
-        retry=retry_if_exception_type((RateLimitError, InternalServerError, APIConnectionError)),
+        retry=retry_if_exception_type(_TRANSIENT_ERRORS),
         # Бесплатный Groq требует долгих пауз при ошибках 429
         wait=wait_exponential(multiplier=2, min=5, max=120),
         stop=stop_after_attempt(10),
         before_sleep=before_sleep_log(LOGGER, logging.INFO),
     )
     async def acomplete(self, prompt: str, json_mode: bool = False, cache_key: Optional[str] = None) -> str:
-        # Check cache first
-        cached = None
-        if cache_key:
-            cached = get_cached_by_key(cache_key)
-        else:
-            cached = get_cached(prompt, json_mode)
-            
+        # Check cache first; the key is computed once and reused below
+        key = response_cache_key(prompt, json_mode, cache_key)
+        cached = get_cached_by_key(key)
         if cached:
             LOGGER.info("Returning cached response")
             return cached
-        
+
+        check_recent_failure(key)
+
         # Dedupe concurrent identical requests
-        dedupe_key = f"{json_mode}:{cache_key or prompt}"
+        dedupe_key = (json_mode, key)
         loop = asyncio.get_running_loop()
         pending = _pending_requests.get(dedupe_key)
         if pending:
@@ -76,56 +104,42 @@ class GroqLLMAdapter(BaseLLMAdapter):
                     LOGGER.warning("Falling back to text mode (json_mode=False) due to bad request.")
                     result = await self._invoke(prompt, json_mode=False)
                 else:
+                    record_failure(key, exc)
                     future.set_exception(exc)
                     raise
             except (AuthenticationError, PermissionDeniedError) as exc:
                 LOGGER.critical("Groq authentication/permission error: %s. Check your GROQ_API_KEY.", exc)
+                record_failure(key, exc)
                 future.set_exception(exc)
                 raise  # Do not retry
             except Exception as exc:
                 LOGGER.error("Groq request failed: %s", exc)
+                if not isinstance(exc, _TRANSIENT_ERRORS):
+                    record_failure(key, exc)
                 future.set_exception(exc)
                 raise
 
             # Success: cache and set result
-            if cache_key:
-                set_cached_by_key(cache_key, result)
-            else:
-                set_cached(prompt, result, json_mode)
+            set_cached_by_key(key, result)
             future.set_result(result)
             return result
         finally:
             _pending_requests.pop(dedupe_key, None)
 
     async def _invoke(self, prompt: str, json_mode: bool) -> str:
+        await get_llm_rate_limiter().acquire()
         LOGGER.info("Calling Groq with model '%s' (json_mode=%s)", self.model, json_mode)
-        response_format = {"type": "json_object"} if json_mode else None
-        system_prompt = "You are a helpful assistant that generates code."
-        if json_mode:
-            system_prompt += (
-                " You MUST respond with ONLY valid JSON. "
-                "Do NOT include any text, explanations, or markdown before or after the JSON object. "
-                "Your entire response must be parseable by JSON.parse(). "
-                "Start with { and end with }. "
-                "The 'content' field for files MUST be a plain string (not object/array). "
-                "Properly escape all newlines as \\n and quotes as \\\"."
-            )
-
+        response_format = JSON_RESPONSE_FORMAT if json_mode else None
         chat_completion = await self.client.chat.completions.create(
             messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt,
-                },
+                _SYSTEM_MESSAGE_JSON if json_mode else _SYSTEM_MESSAGE_TEXT,
                 {
                     "role": "user",
                     "content": prompt,
                 },
             ],
-            model=self.model,
-            temperature= 0.15,  # Lower for 70B (already very creative)
-            max_tokens=32000,  # Max for llama-3.3-70b (supports 32K)
             response_format=response_format,
+            **self._base_kwargs,
         )
         choice = chat_completion.choices[0]
         finish_reason = getattr(choice, "finish_reason", None)
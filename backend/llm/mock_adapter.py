@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import json
 from typing import Optional
 
+import orjson
+
 from .adapter import BaseLLMAdapter
 
 class MockLLMAdapter(BaseLLMAdapter):
@@ -10,20 +11,19 @@ class MockLLMAdapter(BaseLLMAdapter):
     async def acomplete(self, prompt: str, json_mode: bool = False, cache_key: Optional[str] = None) -> str:
         marker = "FILES_SPEC::"
         if marker in prompt:
-            _, payload = prompt.split(marker, maxsplit=1)
-            payload = payload.strip()
+            payload = prompt.partition(marker)[2].strip()
             try:
-                files = json.loads(payload)
-            except json.JSONDecodeError:
+                files = orjson.loads(payload)
+            except orjson.JSONDecodeError:
                 files = [
                     {
                         "path": "README.md",
                         "content": "# Mock output\nThis is a fallback artifact.",
                     }
                 ]
-            return json.dumps({"files": files})
+            return orjson.dumps({"files": files}).decode("utf-8")
 
-        return json.dumps(
+        return orjson.dumps(
             {
                 "files": [
                     {
@@ -32,4 +32,4 @@ class MockLLMAdapter(BaseLLMAdapter):
                     }
                 ]
             }
-        )
+        ).decode("utf-8")
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -12,56 +14,68 @@ from tenacity import (
 )
 
 from backend.utils.logging import get_logger
-from backend.llm.cache import get_cached, set_cached, get_cached_by_key, set_cached_by_key
+from backend.llm.cache import get_cached_by_key, response_cache_key, set_cached_by_key
 
 from .adapter import BaseLLMAdapter
 
 LOGGER = get_logger(__name__)
 
+OLLAMA_DEFAULT_PORT = 11434
+# How long the Ollama server keeps the model (and its KV cache) loaded after a call
+KEEP_ALIVE = "10m"
+
+def _base_url(host: str) -> str:
+    # Same forms OLLAMA_HOST accepts: bare host, host:port or a full URL;
+    # plain http without a port means Ollama's default port
+    parts = urlsplit(host if "://" in host else f"http://{host}")
+    if parts.port is None and parts.scheme == "http":
+        parts = parts._replace(netloc=f"{parts.netloc}:{OLLAMA_DEFAULT_PORT}")
+    return urlunsplit(parts).rstrip("/")
+
 class OllamaLLMAdapter(BaseLLMAdapter):
 
-    def __init__(self, model: str = "llama3"):
+    def __init__(self, model: str = "llama3", host: str = "http://localhost:11434"):
         self.model = model
+        self.base_url = _base_url(host)
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        # Created on first use so the client binds to the running event loop
+        if self._http is None:
+            self._http = httpx.AsyncClient(base_url=self.base_url, timeout=httpx.Timeout(600.0, connect=5.0))
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     @retry(
-        retry=retry_if_exception_type(RuntimeError),
+        retry=retry_if_exception_type((RuntimeError, httpx.TransportError)),
         wait=wait_fixed(2),  # Wait 2 seconds between local retries
         stop=stop_after_attempt(3),
         before_sleep=before_sleep_log(LOGGER, logging.WARNING),
     )
     async def acomplete(self, prompt: str, json_mode: bool = False, cache_key: Optional[str] = None) -> str:
-        # Check cache first
-        cached = None
-        if cache_key:
-            cached = get_cached_by_key(cache_key)
-        else:
-            cached = get_cached(prompt, json_mode)
-            
+        # Check cache first; the key is computed once and reused below
+        key = response_cache_key(prompt, json_mode, cache_key)
+        cached = get_cached_by_key(key)
         if cached:
             LOGGER.info("Returning cached response")
             return cached
 
         LOGGER.info("Calling Ollama with model '%s' (json_mode=%s)", self.model, json_mode)
         
-        cmd = ["ollama", "run", self.model]
+        body = {"model": self.model, "prompt": prompt, "stream": False, "keep_alive": KEEP_ALIVE}
         if json_mode:
-            cmd.extend(["--format", "json"])
-            
+            body["format"] = "json"
+
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await process.communicate(prompt.encode("utf-8"))
-            if process.returncode != 0:
-                error_msg = stderr.decode("utf-8")
-                LOGGER.error("Ollama failed: %s", error_msg)
-                raise RuntimeError(
-                    f"Ollama exited with {process.returncode}: {error_msg}"
-                )
-            result = stdout.decode("utf-8")
+            resp = await self._client().post("/api/generate", json=body)
+            if resp.is_error:
+                LOGGER.error("Ollama failed: %s", resp.text)
+                raise RuntimeError(f"Ollama returned {resp.status_code}: {resp.text}")
+            result = resp.json()["response"]
             
             if not result.strip():
                 LOGGER.warning("Ollama returned empty response.")
@@ -70,10 +84,7 @@ class OllamaLLMAdapter(BaseLLMAdapter):
 
             LOGGER.info("Ollama response received (length=%d)", len(result))
             
-            if cache_key:
-                set_cached_by_key(cache_key, result)
-            else:
-                set_cached(prompt, result, json_mode)
+            set_cached_by_key(key, result)
                 
             return result
         except Exception as exc:
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_exponential,
+)
+
+from backend.llm.cache import (
+    check_recent_failure,
+    get_cached_by_key,
+    record_failure,
+    response_cache_key,
+    set_cached_by_key,
+)
+from backend.settings import get_settings
+
+Message = Dict[str, str]
+
+# Retried with backoff. Anything else (bad request, auth, truncation) is raised
+# at once instead of holding the caller's LLM semaphore slot through the
+# backoff, and is remembered by the negative cache. httpx.TransportError covers
+# read timeouts and dropped connections while a stream is being consumed: the
+# SDK only maps those to APITimeoutError/APIConnectionError before the stream
+# starts.
+TRANSIENT_ERRORS = (
+    APIConnectionError,
+    APITimeoutError,
+    RateLimitError,
+    InternalServerError,
+    httpx.TransportError,
+)
+
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+def system_turns(text_prompt: str, json_prompt: str) -> Tuple[Message, Message]:
+    """Text- and JSON-mode system messages, built once per adapter module.
+
+    Every request then sends an identical system turn, which keeps the prompt
+    prefix stable for providers that cache shared prefixes. The dicts are shared
+    between requests and must be treated as read-only (the SDKs only serialize
+    them); the same goes for JSON_RESPONSE_FORMAT.
+    """
+    return {"role": "system", "content": text_prompt}, {"role": "system", "content": json_prompt}
+
+def stream_kwargs(model: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
+    """Base ``chat.completions.create`` kwargs for a streamed completion.
+
+    Streaming makes the HTTP read timeout apply between chunks rather than to
+    the whole (up to max_tokens) completion.
+    """
+    return {"model": model, "temperature": temperature, "max_tokens": max_tokens, "stream": True}
+
+def retry_transient(logger: logging.Logger) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Backoff policy for OpenAI-compatible providers: TRANSIENT_ERRORS only, within 60s."""
+    return retry(
+        retry=retry_if_exception_type(TRANSIENT_ERRORS),
+        wait=wait_exponential(multiplier=1, min=2, max=20),
+        stop=stop_after_delay(60) | stop_after_attempt(5),
+        before_sleep=before_sleep_log(logger, logging.INFO),
+        reraise=True,
+    )
+
+async def cached_complete(
+    invoke: Callable[[str, bool], Awaitable[str]],
+    prompt: str,
+    json_mode: bool,
+    cache_key: Optional[str],
+    *,
+    provider: str,
+    logger: logging.Logger,
+) -> str:
+    """Serve ``prompt`` from the response cache, else call ``invoke`` and cache the result.
+
+    Non-transient failures go to the negative cache, so an identical request
+    within its TTL fails at once.
+    """
+    # The key is computed once and reused for every cache below
+    key = response_cache_key(prompt, json_mode, cache_key)
+    cached = get_cached_by_key(key)
+    if cached:
+        logger.info("Returning cached response")
+        return cached
+
+    check_recent_failure(key)
+    try:
+        result = await invoke(prompt, json_mode)
+    except Exception as exc:
+        logger.error("%s request failed: %s", provider, exc)
+        if not isinstance(exc, TRANSIENT_ERRORS):
+            record_failure(key, exc)
+        raise
+    set_cached_by_key(key, result)
+    return result
+
+def build_openai_client(base_url: str, api_key: Optional[str]) -> AsyncOpenAI:
+    """AsyncOpenAI client for an OpenAI-compatible provider with a sized, long-lived pool.
+
+    Connections are kept alive between calls so agents do not repeat the TCP/TLS
+    handshake, and the pool is sized to the LLM semaphore that bounds in-flight
+    requests. SDK retries are off: the adapters already retry with tenacity.
+    """
+    pool_size = get_settings().llm_semaphore * 2
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=300.0,
+        ),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+    )
+    return AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client, max_retries=0)
+
+async def collect_stream(stream: AsyncIterator[Any]) -> Tuple[str, Optional[str]]:
+    """Join a streamed chat completion into ``(content, finish_reason)``."""
+    parts: List[str] = []
+    finish_reason: Optional[str] = None
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.delta.content:
+            parts.append(choice.delta.content)
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+    return "".join(parts), finish_reason
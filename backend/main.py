@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from backend.api import (
     projects,
@@ -18,6 +19,10 @@ from backend.api import (
 )
 from backend.core.orchestrator import orchestrator
 from backend.core.document_orchestrator import document_orchestrator
+from backend.core.document_event_bus import flush_document_events
+from backend.core.event_bus import flush_events
+from backend.core.task_registry import document_task_registry
+from backend.llm.adapter import close_llm_adapter
 from backend.memory.db import init_db, async_session_factory
 from backend.memory.models import Task
 from backend.settings import get_settings
@@ -31,6 +36,18 @@ async def lifespan(app: FastAPI):
     # Startup
     settings = get_settings()
     LOGGER.info("Using projects_root: %s", settings.projects_root.resolve())
+    # uvicorn picks uvloop when it is installed (--loop auto); surface it if we
+    # ended up on the stock asyncio loop so scheduling regressions are visible.
+    loop_type = type(asyncio.get_running_loop())
+    if loop_type.__module__.startswith("uvloop"):
+        LOGGER.info("Event loop: %s", loop_type.__name__)
+    else:
+        LOGGER.warning("Event loop: %s.%s (uvloop not active)", loop_type.__module__, loop_type.__name__)
+    # Python 3.12+: tasks run synchronously until their first real suspension,
+    # so fire-and-forget emits and cached lookups skip a scheduling round-trip.
+    eager_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_factory is not None:
+        asyncio.get_running_loop().set_task_factory(eager_factory)
     await init_db()
     
     # Optimization: Cleanup "zombie" tasks that were left running when server died
@@ -38,37 +55,59 @@ async def lifespan(app: FastAPI):
         from backend.memory.models import Project, DocumentProject
         
         async with async_session_factory() as session:
-            # 1. Reset Tasks
-            statement = select(Task).where(Task.status == "running")
-            result = await session.execute(statement)
-            zombies = result.scalars().all()
-            
-            if zombies:
-                LOGGER.warning("Found %d zombie tasks. Resetting to 'failed'.", len(zombies))
-                for task in zombies:
-                    task.status = "failed"
-                    session.add(task)
-                await session.commit()
-            
-            # 2. Resume Projects (LangGraph Persistence)
-            statement_proj = select(Project).where(Project.status == "running")
-            result_proj = await session.execute(statement_proj)
-            running_projects = result_proj.scalars().all()
+            # 1. Reset Tasks (one UPDATE instead of loading and saving each row)
+            result = await session.execute(
+                update(Task).where(Task.status == "running").values(status="failed")
+            )
+            await session.commit()
+            if result.rowcount:
+                LOGGER.warning("Found %d zombie tasks. Reset to 'failed'.", result.rowcount)
             
-            if running_projects:
-                LOGGER.info("Found %d interrupted projects. Attempting to resume...", len(running_projects))
-                for proj in running_projects:
-                    # Async fire and forget resume
-                    await orchestrator.resume_project(proj.id)
-
-            # 3. Resume Documents
-            statement_docs = select(DocumentProject).where(DocumentProject.status == "running")
-            result_docs = await session.execute(statement_docs)
-            running_docs = result_docs.scalars().all()
-            if running_docs:
-                LOGGER.info("Found %d interrupted documents. Attempting to resume...", len(running_docs))
-                for doc in running_docs:
-                    await document_orchestrator.resume_document(doc.id)
+            # 2. Projects to resume (LangGraph Persistence)
+            result_proj = await session.execute(
+                select(Project.id).where(Project.status == "running")
+            )
+            project_ids = result_proj.scalars().all()
+
+            # Queued projects may never have reached the graph (no checkpoint)
+            result_queued = await session.execute(
+                select(Project.id, Project.title, Project.description, Project.target).where(
+                    Project.status == "queued"
+                )
+            )
+            queued_projects = result_queued.all()
+
+            # 3. Documents to resume
+            result_docs = await session.execute(
+                select(DocumentProject.id).where(DocumentProject.status == "running")
+            )
+            document_ids = result_docs.scalars().all()
+
+        # Ownership rows of worker processes that died mid-run are never
+        # released by their owner; resumed documents re-register below
+        await document_task_registry.release_dead_workers()
+
+        # Resumes run concurrently (each uses its own session); one failure
+        # does not stop the rest
+        if project_ids:
+            LOGGER.info("Found %d interrupted projects. Attempting to resume...", len(project_ids))
+        if queued_projects:
+            LOGGER.info("Found %d queued projects. Re-queueing...", len(queued_projects))
+        if document_ids:
+            LOGGER.info("Found %d interrupted documents. Attempting to resume...", len(document_ids))
+        resume_ids = [*project_ids, *(row.id for row in queued_projects), *document_ids]
+        results = await asyncio.gather(
+            *(orchestrator.resume_project(pid) for pid in project_ids),
+            *(
+                orchestrator.recover_queued_project(row.id, row.title, row.description, row.target)
+                for row in queued_projects
+            ),
+            *(document_orchestrator.resume_document(did) for did in document_ids),
+            return_exceptions=True,
+        )
+        for resume_id, outcome in zip(resume_ids, results):
+            if isinstance(outcome, BaseException):
+                LOGGER.error("Failed to resume %s: %s", resume_id, outcome)
     except Exception as e:
         LOGGER.error("Failed to recover state: %s", e)
 
@@ -76,6 +115,9 @@ async def lifespan(app: FastAPI):
     # Shutdown logic here if needed
     await orchestrator.shutdown()
     await document_orchestrator.shutdown()
+    await flush_events()
+    await flush_document_events()
+    await close_llm_adapter()
 
 app = FastAPI(
     title="AI Company Backend", 
@@ -162,3 +162,15 @@ class TeamMember(SQLModel, table=True):
         sa_column=Column(DateTime(timezone=True), default=datetime.utcnow)
     )
 
+
+class DocumentTask(SQLModel, table=True):
+    __tablename__ = "document_tasks"
+
+    # One row per running document workflow, shared by all workers on this DB
+    document_id: UUID = Field(foreign_key="document_projects.id", primary_key=True)
+    worker_id: str = Field(index=True)
+    pid: int
+    stop_requested: bool = Field(default=False)
+    started_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), default=datetime.utcnow)
+    )
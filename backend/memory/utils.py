@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Optional, Sequence
-from uuid import UUID
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
 
-from sqlalchemy import select, update
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import (
@@ -11,6 +12,7 @@ from .models import (
     DocumentArtifact,
     DocumentEvent,
     DocumentProject,
+    DocumentTask,
     Event,
     Project,
     Task,
@@ -20,6 +22,16 @@ async def get_project(session: AsyncSession, project_id: UUID) -> Optional[Proje
     result = await session.execute(select(Project).where(Project.id == project_id))
     return result.scalar_one_or_none()
 
+async def get_project_agent_config(
+    session: AsyncSession, project_id: UUID
+) -> Optional[Tuple[Optional[str], Optional[UUID], Optional[UUID]]]:
+    """(agent_preset, custom_agent_id, team_id) for a project, or None if missing."""
+    result = await session.execute(
+        select(Project.agent_preset, Project.custom_agent_id, Project.team_id).where(Project.id == project_id)
+    )
+    row = result.first()
+    return tuple(row) if row is not None else None
+
 async def list_projects(session: AsyncSession) -> Sequence[Project]:
     result = await session.execute(select(Project))
     return result.scalars().all()
@@ -47,6 +59,20 @@ async def record_event(
         await session.refresh(event)
     return event
 
+async def _insert_event_rows(session: AsyncSession, model: Any, rows: Sequence[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+    await session.execute(insert(model), [{"id": uuid4(), **row} for row in rows])
+    await session.commit()
+
+async def record_events_bulk(session: AsyncSession, rows: Sequence[Dict[str, Any]]) -> None:
+    """Insert many events in one executemany and a single commit.
+
+    Each row holds ``Event`` column values (project_id, agent, level, message,
+    data, timestamp); ids are generated here.
+    """
+    await _insert_event_rows(session, Event, rows)
+
 async def upsert_task(
     session: AsyncSession,
     *,
@@ -138,13 +164,12 @@ async def list_artifacts(session: AsyncSession, project_id: UUID) -> List[Artifa
 
 async def update_project_status(
     session: AsyncSession, project_id: UUID, status: str
-) -> Project:
+) -> None:
+    # Plain UPDATE; callers only need the write, so skip re-selecting the row.
     await session.execute(
         update(Project).where(Project.id == project_id).values(status=status)
     )
     await session.commit()
-    result = await session.execute(select(Project).where(Project.id == project_id))
-    return result.scalar_one()
 
 async def get_document_project(session: AsyncSession, document_id: UUID) -> Optional[DocumentProject]:
     result = await session.execute(select(DocumentProject).where(DocumentProject.id == document_id))
@@ -156,13 +181,12 @@ async def list_document_projects(session: AsyncSession, *, limit: int = 50, offs
     )
     return list(result.scalars().all())
 
-async def update_document_status(session: AsyncSession, document_id: UUID, status: str) -> DocumentProject:
+async def update_document_status(session: AsyncSession, document_id: UUID, status: str) -> None:
+    # Plain UPDATE; callers only need the write, so skip re-selecting the row.
     await session.execute(
         update(DocumentProject).where(DocumentProject.id == document_id).values(status=status)
     )
     await session.commit()
-    result = await session.execute(select(DocumentProject).where(DocumentProject.id == document_id))
-    return result.scalar_one()
 
 async def record_document_event(
     session: AsyncSession,
@@ -187,6 +211,10 @@ async def record_document_event(
         await session.refresh(event)
     return event
 
+async def record_document_events_bulk(session: AsyncSession, rows: Sequence[Dict[str, Any]]) -> None:
+    """Document counterpart of :func:`record_events_bulk` (rows keyed by document_id)."""
+    await _insert_event_rows(session, DocumentEvent, rows)
+
 async def add_document_artifacts(
     session: AsyncSession, document_id: UUID, paths: Iterable[str], sizes: Iterable[int]
 ) -> None:
@@ -200,3 +228,52 @@ async def list_document_artifacts(session: AsyncSession, document_id: UUID) -> L
         select(DocumentArtifact).where(DocumentArtifact.document_id == document_id)
     )
     return list(result.scalars().all())
+
+async def upsert_document_task(
+    session: AsyncSession, document_id: UUID, *, worker_id: str, pid: int
+) -> None:
+    result = await session.execute(select(DocumentTask).where(DocumentTask.document_id == document_id))
+    record = result.scalar_one_or_none()
+    if record:
+        record.worker_id = worker_id
+        record.pid = pid
+        record.stop_requested = False
+        record.started_at = datetime.utcnow()
+    else:
+        session.add(DocumentTask(document_id=document_id, worker_id=worker_id, pid=pid))
+    await session.commit()
+
+async def delete_document_task(session: AsyncSession, document_id: UUID, *, worker_id: str) -> None:
+    await session.execute(
+        delete(DocumentTask).where(
+            DocumentTask.document_id == document_id, DocumentTask.worker_id == worker_id
+        )
+    )
+    await session.commit()
+
+async def request_document_task_stop(session: AsyncSession, document_id: UUID) -> bool:
+    result = await session.execute(
+        update(DocumentTask).where(DocumentTask.document_id == document_id).values(stop_requested=True)
+    )
+    await session.commit()
+    return bool(result.rowcount)
+
+async def list_document_task_owners(session: AsyncSession) -> List[Tuple[str, int]]:
+    """Distinct (worker_id, pid) pairs that currently own document task rows."""
+    result = await session.execute(select(DocumentTask.worker_id, DocumentTask.pid).distinct())
+    return [tuple(row) for row in result.all()]
+
+async def delete_document_tasks_of_workers(session: AsyncSession, worker_ids: Sequence[str]) -> int:
+    if not worker_ids:
+        return 0
+    result = await session.execute(delete(DocumentTask).where(DocumentTask.worker_id.in_(worker_ids)))
+    await session.commit()
+    return result.rowcount or 0
+
+async def list_stop_requested_document_tasks(session: AsyncSession, worker_id: str) -> List[UUID]:
+    result = await session.execute(
+        select(DocumentTask.document_id).where(
+            DocumentTask.worker_id == worker_id, DocumentTask.stop_requested.is_(True)
+        )
+    )
+    return list(result.scalars().all())
@@ -23,12 +23,25 @@ class Settings(BaseSettings):
     
     # Model configurations
     ollama_model: str = Field(default="llama3.2:3b")
+    # Read from OLLAMA_HOST like the ollama CLI; "host", "host:port" or a full URL
+    ollama_host: str = Field(default="http://localhost:11434")
     groq_model: str = Field(default="llama-3.3-70b-versatile")
     github_model: str = Field(default="gpt-4o")  # gpt-4o, claude-3-5-sonnet, llama-3.1-70b
     deepseek_model: str = Field(default="deepseek-chat")  # deepseek-chat or deepseek-coder
     cerebras_model: str = Field(default="llama-3.3-70b")  # llama-3.3-70b (best), llama3.1-8b, qwen-3-32b
     
     llm_semaphore: int = Field(default=1)  # Строго по одному запросу для стабильности на Groq
+    # Provider requests per second (burst = llm_semaphore); None -> llm_semaphore
+    llm_rate_per_sec: Optional[float] = Field(default=None, gt=0)
+    # Project workflows running at once; the rest wait with status "queued"
+    max_concurrent_workflows: int = Field(default=8, ge=1)
+    # In-process LLM response cache entries (LRU)
+    llm_cache_size: int = Field(default=1024, ge=1)
+    # Opt-in: also keep responses in an LMDB store under data_root (shared across
+    # worker processes, survives restarts; one store per provider/model).
+    # Ignored when the lmdb package is missing
+    llm_cache_lmdb: bool = Field(default=False)
+    llm_cache_lmdb_ttl_s: int = Field(default=86400, ge=1)
     github_api_url: str = Field(default="https://api.github.com")
     admin_api_key: Optional[str] = Field(default=None)
 
@@ -72,7 +85,7 @@ class Settings(BaseSettings):
             case_sensitive = False
             extra = "ignore"
 
-@lru_cache
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     settings = Settings()
     settings.projects_root.mkdir(parents=True, exist_ok=True)
@@ -2,6 +2,7 @@ import asyncio
 import json
 
 from backend.agents.developer import DeveloperAgent
+from backend.core.state import AgentContext
 
 
 def test_execute_with_retry_accepts_file_key(monkeypatch):
@@ -14,7 +15,7 @@ def test_execute_with_retry_accepts_file_key(monkeypatch):
                 return json.dumps({"file": {"path": "a.txt", "content": "hello"}})
 
         agent._adapter = A()
-        ctx = {"project_id": "testproj", "title": "t", "description": "d"}
+        ctx = AgentContext(project_id="testproj", title="t", description="d")
         res = await agent._execute_with_retry("prompt", {"name": "step"}, ctx)
         assert isinstance(res, dict)
         assert "files" in res
@@ -34,7 +35,7 @@ def test_execute_with_retry_accepts_top_level_file_dict(monkeypatch):
                 return json.dumps({"path": "b.txt", "content": "bye"})
 
         agent._adapter = A()
-        ctx = {"project_id": "testproj", "title": "t", "description": "d"}
+        ctx = AgentContext(project_id="testproj", title="t", description="d")
         res = await agent._execute_with_retry("prompt", {"name": "step"}, ctx)
         assert "files" in res
         assert res["files"][0]["path"] == "b.txt"
@@ -52,7 +53,7 @@ def test_execute_with_retry_discovers_list_value(monkeypatch):
                 return json.dumps({"response": [{"path": "c.txt", "content": "c"}]})
 
         agent._adapter = A()
-        ctx = {"project_id": "testproj", "title": "t", "description": "d"}
+        ctx = AgentContext(project_id="testproj", title="t", description="d")
         res = await agent._execute_with_retry("prompt", {"name": "step"}, ctx)
         assert "files" in res
         assert res["files"][0]["path"] == "c.txt"
@@ -79,7 +80,7 @@ def test_execute_with_retry_auto_repair(monkeypatch):
         sem = asyncio.Semaphore(1)
         agent = DeveloperAgent(sem)
         agent._adapter = A()
-        ctx = {"project_id": "testproj", "title": "t", "description": "d"}
+        ctx = AgentContext(project_id="testproj", title="t", description="d")
         res = await agent._execute_with_retry("prompt", {"name": "step"}, ctx)
         assert "files" in res
         assert res["files"][0]["path"] == "fixed.txt"
@@ -0,0 +1,46 @@
+import pytest
+
+from backend.llm import cache
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROJECTS_ROOT", str(tmp_path / "projects"))
+    monkeypatch.setenv("DOCUMENTS_ROOT", str(tmp_path / "documents"))
+    monkeypatch.setenv("LLM_CACHE_LMDB", "false")
+    cache.get_settings.cache_clear()
+    cache._lmdb_env.cache_clear()
+    cache.clear_cache()
+    yield
+    cache.clear_cache()
+    cache._lmdb_env.cache_clear()
+    cache.get_settings.cache_clear()
+
+
+def test_recorded_failure_fails_fast_until_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    key = cache.response_cache_key("prompt", json_mode=True)
+
+    cache.record_failure(key, ValueError("bad request"))
+    with pytest.raises(RuntimeError, match="recent-failure"):
+        cache.check_recent_failure(key)
+
+    # Other prompts and modes are unaffected
+    cache.check_recent_failure(cache.response_cache_key("prompt", json_mode=False))
+
+    now[0] += cache.NEGATIVE_TTL_S + 1
+    cache.check_recent_failure(key)
+    # Expired entries are dropped on lookup
+    assert key not in cache._failures
+
+
+def test_response_cache_roundtrip_and_explicit_keys():
+    key = cache.response_cache_key("prompt", json_mode=False)
+    assert cache.response_cache_key("prompt", json_mode=False, cache_key="explicit") == "explicit"
+
+    assert cache.get_cached_by_key(key) is None
+    cache.set_cached_by_key(key, "answer")
+    assert cache.get_cached_by_key(key) == "answer"
+    assert cache.get_cached("prompt") == "answer"
+    assert cache.get_cached("prompt", json_mode=True) is None
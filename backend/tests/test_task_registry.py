@@ -0,0 +1,111 @@
+import asyncio
+import types
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+from backend.core import task_registry
+from backend.core.task_registry import WORKER_ID, DocumentTaskRegistry
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """In-memory stand-in for the document_tasks table."""
+    state = types.SimpleNamespace(rows={}, stop_requested=set(), owners=[], released=[])
+
+    @asynccontextmanager
+    async def fake_session():
+        yield None
+
+    async def upsert_document_task(session, document_id, *, worker_id, pid):
+        state.rows[document_id] = worker_id
+
+    async def delete_document_task(session, document_id, *, worker_id):
+        if state.rows.get(document_id) == worker_id:
+            del state.rows[document_id]
+
+    async def list_stop_requested_document_tasks(session, worker_id):
+        return [d for d in state.stop_requested if state.rows.get(d) == worker_id]
+
+    async def list_document_task_owners(session):
+        return list(state.owners)
+
+    async def delete_document_tasks_of_workers(session, worker_ids):
+        state.released.extend(worker_ids)
+        return len(worker_ids)
+
+    fake_utils = types.SimpleNamespace(
+        upsert_document_task=upsert_document_task,
+        delete_document_task=delete_document_task,
+        list_stop_requested_document_tasks=list_stop_requested_document_tasks,
+        list_document_task_owners=list_document_task_owners,
+        delete_document_tasks_of_workers=delete_document_tasks_of_workers,
+    )
+    monkeypatch.setattr(task_registry, "get_session", fake_session)
+    monkeypatch.setattr(task_registry, "db_utils", fake_utils)
+    monkeypatch.setattr(task_registry, "STOP_POLL_INTERVAL", 0.01)
+    return state
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_remote_stop_request_cancels_local_task(db):
+    async def inner():
+        registry = DocumentTaskRegistry()
+        doc_id = uuid4()
+        task = await registry.register(str(doc_id), asyncio.sleep(10))
+        assert db.rows[doc_id] == WORKER_ID
+
+        # Another worker flags the row; the watcher picks it up on its next poll
+        db.stop_requested.add(doc_id)
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, timeout=1.0)
+        await _settle()
+
+        assert str(doc_id) not in registry._tasks
+        assert doc_id not in db.rows
+
+    asyncio.run(inner())
+
+
+def test_finished_old_run_keeps_newer_registration(db):
+    async def inner():
+        registry = DocumentTaskRegistry()
+        doc_id = uuid4()
+        release_old = asyncio.Event()
+        old = await registry.register(str(doc_id), release_old.wait())
+        new = await registry.register(str(doc_id), asyncio.sleep(10))
+
+        release_old.set()
+        await old
+        await _settle()
+
+        assert registry._tasks[str(doc_id)] is new
+        assert db.rows[doc_id] == WORKER_ID
+
+        new.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await new
+        await _settle()
+        assert not registry._tasks
+
+    asyncio.run(inner())
+
+
+def test_release_dead_workers_skips_live_and_remote_owners(db, monkeypatch):
+    host = WORKER_ID.rsplit(":", 1)[0]
+    db.owners = [
+        (WORKER_ID, 1),  # our own id left by a previous process with this pid
+        (f"{host}:111", 111),  # dead process on this host
+        (f"{host}:222", 222),  # live process on this host
+        ("elsewhere:333", 333),  # other host: cannot be checked
+    ]
+    monkeypatch.setattr(task_registry, "_pid_alive", lambda pid: pid == 222)
+
+    asyncio.run(DocumentTaskRegistry().release_dead_workers())
+
+    assert sorted(db.released) == sorted([WORKER_ID, f"{host}:111"])
@@ -0,0 +1,61 @@
+import asyncio
+
+from backend.core import ws_manager
+from backend.core.ws_manager import WSManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.sent.append(message)
+
+
+def test_full_queue_drops_oldest_message(monkeypatch):
+    monkeypatch.setattr(ws_manager, "WS_QUEUE_MAX", 3)
+
+    async def inner():
+        manager = WSManager()
+        ws = FakeWebSocket()
+        await manager.connect("p", ws)
+
+        # Published without yielding, so the writer has not drained anything yet
+        for i in range(5):
+            manager.publish("p", f'"{i}"'.encode())
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert ws.sent == ['"2"', '"3"', '"4"']
+        await manager.disconnect("p", ws)
+
+    asyncio.run(inner())
+
+
+def test_writer_exits_after_last_disconnect():
+    async def inner():
+        manager = WSManager()
+        first, second = FakeWebSocket(), FakeWebSocket()
+        await manager.connect("p", first)
+        await manager.connect("p", second)
+        writer = manager._writers["p"]
+
+        await manager.disconnect("p", first)
+        assert not writer.done()
+        manager.publish("p", {"msg": "still here"})
+        await asyncio.sleep(0.01)
+        assert len(second.sent) == 1 and not first.sent
+
+        await manager.disconnect("p", second)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert writer.done()
+        assert not manager.has_connections("p")
+        # Nobody is listening: publishing is a no-op
+        manager.publish("p", {"msg": "dropped"})
+        assert len(second.sent) == 1
+
+    asyncio.run(inner())
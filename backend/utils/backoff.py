@@ -0,0 +1,102 @@
+"""Rate-limit aware retry helpers for agent-level LLM calls.
+
+Provider adapters already retry transient errors internally (tenacity); these
+helpers handle what leaks through — usually a ``RateLimitError`` wrapped in a
+``RetryError`` — with exponential backoff plus jitter, and a process-wide
+cooldown so concurrent agents wait out a 429 instead of each issuing a request
+that is bound to fail.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import random
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from backend.utils.logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Detect provider rate limits without a hard dependency on provider SDKs."""
+    try:
+        from tenacity import RetryError  # type: ignore[import-not-found]
+        if isinstance(exc, RetryError):
+            last = exc.last_attempt.exception()
+            if last and last.__class__.__name__ == "RateLimitError":
+                return True
+    except Exception:
+        pass
+    if exc.__class__.__name__ == "RateLimitError":
+        return True
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    txt = (str(exc) or "").lower()
+    return ("rate limit" in txt) or ("ratelimit" in txt) or ("RateLimitError" in repr(exc))
+
+
+def backoff_delay(attempt: int, base: float = 10.0, cap: float = 60.0) -> float:
+    """Exponential backoff with jitter: ``min(base * 2**attempt + U(0, 1), cap)``."""
+    return min(base * 2 ** attempt + random.uniform(0, 1), cap)
+
+
+class RateLimitCooldown:
+    """Process-wide cooldown window opened by the most recent rate-limit error."""
+
+    def __init__(self) -> None:
+        self._until = 0.0
+
+    def trip(self, seconds: float) -> None:
+        self._until = max(self._until, time.monotonic() + seconds)
+
+    def should_wait(self) -> float:
+        """Seconds left in the current cooldown window (0.0 when clear)."""
+        return max(0.0, self._until - time.monotonic())
+
+    async def wait(self) -> None:
+        delay = self.should_wait()
+        if delay > 0:
+            LOGGER.info("Rate-limit cooldown active, waiting %.1fs before LLM call", delay)
+            await asyncio.sleep(delay)
+
+
+rate_limit_cooldown = RateLimitCooldown()
+
+
+def aretry(
+    max_tries: int = 4,
+    base: float = 10.0,
+    cap: float = 60.0,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Retry an async call on provider rate limits.
+
+    Each attempt first waits out the shared cooldown; a rate-limit error trips
+    the cooldown for the next backoff delay so other callers back off as well.
+    Any other exception propagates immediately.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            attempt = 0
+            while True:
+                await rate_limit_cooldown.wait()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as exc:
+                    if attempt + 1 >= max_tries or not is_rate_limit_error(exc):
+                        raise
+                    delay = backoff_delay(attempt, base, cap)
+                    attempt += 1
+                    LOGGER.warning("%s rate limited, retrying in %.1fs (attempt %d/%d)", fn.__qualname__, delay, attempt + 1, max_tries)
+                    rate_limit_cooldown.trip(delay)
+
+        return wrapper
+
+    return decorator
@@ -18,8 +18,12 @@ class CodeFormatter:
 
     @staticmethod
     async def format_project(project_path: Path) -> None:
-        """Format all code in the project directory."""
+        """Format all code in the project directory.
+
+        Called from graph nodes on the event loop: any real formatter must run
+        via ``asyncio.create_subprocess_exec`` (or ``asyncio.to_thread`` for file
+        walks), never a blocking ``subprocess.run``.
+        """
         # TODO: Implement actual formatting using black, prettier, etc.
         # For now, just log that we are skipping formatting to avoid breaking the workflow.
-        LOGGER.info("Skipping code formatting for %s (not implemented)", project_path)
-        pass
+        LOGGER.debug("Skipping code formatting for %s (not implemented)", project_path)
@@ -1,7 +1,13 @@
 """Logging utilities."""
+import atexit
+import functools
 import logging
+import queue
 import sys
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, TypeVar
 
 _logging_configured = False
 
@@ -11,11 +17,22 @@ def configure_logging(level: int = logging.INFO) -> None:
     if _logging_configured:
         return
     
+    # Records are written to stdout by a listener thread, so logging from a
+    # coroutine never blocks the event loop on the write
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = QueueListener(records, stream, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    enqueue = QueueHandler(records)
+    # Only merge the args here; the listener's handler applies the real format
+    enqueue.setFormatter(logging.Formatter('%(message)s'))
     logging.basicConfig(
         level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.StreamHandler(sys.stdout)
+            enqueue
         ]
     )
     _logging_configured = True
@@ -26,3 +43,22 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
         configure_logging()
     return logging.getLogger(name)
 
+
+# Per-node trace fields (project_id, node), set once at node entry so helpers like
+# emit_event can pick them up without threading them through every call.
+trace_context: ContextVar[Mapping[str, Any]] = ContextVar("trace_context", default=MappingProxyType({}))
+
+_T = TypeVar("_T")
+
+def with_trace(node_name: str) -> Callable[[Callable[[Dict[str, Any]], Awaitable[_T]]], Callable[[Dict[str, Any]], Awaitable[_T]]]:
+    """Wrap a graph node so ``trace_context`` carries its project_id and name."""
+    def decorator(fn: Callable[[Dict[str, Any]], Awaitable[_T]]) -> Callable[[Dict[str, Any]], Awaitable[_T]]:
+        @functools.wraps(fn)
+        async def wrapper(state: Dict[str, Any]) -> _T:
+            token = trace_context.set({"project_id": state.get("project_id"), "node": node_name})
+            try:
+                return await fn(state)
+            finally:
+                trace_context.reset(token)
+        return wrapper
+    return decorator
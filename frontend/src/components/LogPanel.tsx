@@ -90,7 +90,7 @@ const LogPanel: React.FC<Props> = ({ events }) => {
               <span style={{ color: "#6b7280", fontSize: '0.9em' }}>[{timestamp}]</span>{" "}
               <span style={{ color, fontWeight: "bold" }}>{event.level.toUpperCase()}</span>{" "}
               <span style={{ color: "#c084fc" }}>({agent})</span>:{" "}
-              <span style={{ color: "#e5e7eb" }}>{event.msg}</span>
+              <span style={{ color: "#e5e7eb", whiteSpace: "pre-wrap" }}>{event.msg}</span>
             </div>
           );
         })}